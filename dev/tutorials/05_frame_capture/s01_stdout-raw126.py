@@ -1,4 +1,12 @@
+import argparse
+import ctypes
+import errno
+import fcntl
+import mmap
+import os
+import queue
 import sys
+import threading
 import time
 from datetime import datetime, timedelta
 
@@ -14,6 +22,16 @@ except ImportError as exc:  # pragma: no cover
     ) from exc
 
 
+# Default number of buffers queued on the sink.  Also bounds the number of
+# frames that may be in flight in the background writer.  Too few buffers
+# drop frames when a write stalls; too many only waste memory.
+DEFAULT_NUM_BUFFERS = 20
+
+# Maximum number of queued frames the writer coalesces into one writev
+# call (16 BayerGR8 1080p frames is about 32 MB per syscall).
+WRITEV_BATCH = 16
+
+
 def find_device_by_serial(serial: str) -> ic4.DeviceInfo:
     devices = ic4.DeviceEnum.devices()
     for dev in devices:
@@ -23,55 +41,53 @@ def find_device_by_serial(serial: str) -> ic4.DeviceInfo:
     raise RuntimeError(f"Camera with serial {serial!r} not found")
 
 
+def _set_values_best_effort(prop_map: ic4.PropertyMap, values) -> None:
+    """Apply (PropId, value) pairs, skipping any the device rejects."""
+    for prop_id, value in values:
+        try:
+            prop_map.set_value(prop_id, value)
+        except ic4.IC4Exception:
+            pass
+
+
 def configure_camera_for_bayer_gr8(grabber: ic4.Grabber, width: int, height: int, fps: float) -> None:
-    # Configure device properties (resolution and pixel format)
-    dmap = grabber.device_property_map
-    try:
-        dmap.set_value(ic4.PropId.WIDTH, width)
-    except ic4.IC4Exception:
-        pass
-    try:
-        dmap.set_value(ic4.PropId.HEIGHT, height)
-    except ic4.IC4Exception:
-        pass
-    # PixelFormat is an enumeration property.  The valid string for
-    # Bayer GR8 is "BayerGR8" according to the IC4 documentation.  If
-    # setting this property fails the camera will continue using its
-    # current pixel format.
-    try:
-        dmap.set_value(ic4.PropId.PIXEL_FORMAT, "BayerGR8")
-    except ic4.IC4Exception:
-        pass
-    # Configure frame rate.  Some devices expose AcquisitionFrameRate as
-    # a float property.  Not all cameras support manual frame rate
-    # control, so ignore any exception.
-    try:
-        dmap.set_value(ic4.PropId.ACQUISITION_FRAME_RATE, float(fps))
-    except ic4.IC4Exception:
-        pass
+    # Configure device properties: resolution, pixel format and frame rate.
+    # The valid PixelFormat string for Bayer GR8 is "BayerGR8" according to
+    # the IC4 documentation.  Not all cameras support manual frame rate
+    # control; any property that cannot be set keeps its current value.
+    _set_values_best_effort(
+        grabber.device_property_map,
+        (
+            (ic4.PropId.WIDTH, width),
+            (ic4.PropId.HEIGHT, height),
+            (ic4.PropId.PIXEL_FORMAT, "BayerGR8"),
+            (ic4.PropId.ACQUISITION_FRAME_RATE, float(fps)),
+        ),
+    )
     # Configure the trigger mode on the driver property map.  To
     # operate the camera with software triggers, set TriggerSource to
     # "Software", TriggerMode to "On" and TriggerSelector to
     # "FrameStart".  If any property is missing or unsupported the
     # exceptions will be ignored.
-    drmap = grabber.driver_property_map
-    try:
-        drmap.set_value(ic4.PropId.TRIGGER_SELECTOR, "FrameStart")
-    except ic4.IC4Exception:
-        pass
-    try:
-        drmap.set_value(ic4.PropId.TRIGGER_SOURCE, "Software")
-    except ic4.IC4Exception:
-        pass
-    try:
-        drmap.set_value(ic4.PropId.TRIGGER_MODE, "On")
-    except ic4.IC4Exception:
-        pass
+    _set_values_best_effort(
+        grabber.driver_property_map,
+        (
+            (ic4.PropId.TRIGGER_SELECTOR, "FrameStart"),
+            (ic4.PropId.TRIGGER_SOURCE, "Software"),
+            (ic4.PropId.TRIGGER_MODE, "On"),
+        ),
+    )
 
 
 class _RawQueueSinkListener(ic4.QueueSinkListener):
     """Minimal listener that keeps the queue sink active."""
 
+    def __init__(self) -> None:
+        super().__init__()
+        # Set whenever the driver queues a new frame so the capture loop
+        # can block instead of polling the sink.
+        self.frame_ready = threading.Event()
+
     def sink_connected(
         self, sink: ic4.QueueSink, image_type: ic4.ImageType, min_buffers_required: int
     ) -> bool:
@@ -79,12 +95,12 @@ class _RawQueueSinkListener(ic4.QueueSinkListener):
         return True
 
     def frames_queued(self, sink: ic4.QueueSink) -> None:  # pragma: no cover - hardware callback
-        # The capture loop waits on the sink directly, so nothing to do here.
-        return
+        # Wake up the capture loop waiting in record_raw_frames.
+        self.frame_ready.set()
 
 
 def allocate_queue_sink(
-    grabber: ic4.Grabber, width: int, height: int
+    grabber: ic4.Grabber, width: int, height: int, num_buffers: int = DEFAULT_NUM_BUFFERS
 ) -> tuple[ic4.QueueSink, _RawQueueSinkListener]:
     listener = _RawQueueSinkListener()
     sink = ic4.QueueSink(listener, accepted_pixel_formats=[ic4.PixelFormat.BayerGR8])
@@ -92,19 +108,242 @@ def allocate_queue_sink(
         sink,
         setup_option=ic4.StreamSetupOption.DEFER_ACQUISITION_START,
     )
-    num_buffers = 10
     sink.alloc_and_queue_buffers(num_buffers)
     return sink, listener
 
 
+class _BufferPinner:
+    """Locks each sink buffer into RAM with mlock the first time it is seen.
+
+    The sink reuses a fixed set of buffers, so after the first pass over the
+    pool every DMA target is resident and cannot page-fault under memory
+    pressure.  Pinning is best effort: if mlock is unavailable or refused
+    (e.g. RLIMIT_MEMLOCK), a warning is printed once and capture continues.
+    """
+
+    def __init__(self) -> None:
+        self._seen: set[int] = set()
+        self._mlock = None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            mlock = libc.mlock
+        except (OSError, AttributeError, TypeError):
+            return
+        mlock.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+        mlock.restype = ctypes.c_int
+        self._mlock = mlock
+
+    def pin(self, buf: ic4.ImageBuffer) -> None:
+        if self._mlock is None:
+            return
+        arr = buf.numpy_wrap()
+        addr = arr.ctypes.data
+        if addr in self._seen:
+            return
+        self._seen.add(addr)
+        if self._mlock(addr, arr.nbytes) != 0:
+            err = ctypes.get_errno()
+            print(f"mlock failed ({os.strerror(err)}); sink buffers stay pageable", file=sys.stderr)
+            self._mlock = None
+
+
+class _RawFileOutput:
+    """Binary file sink that writes frames with os.write on an O_DIRECT fd.
+
+    O_DIRECT skips the page cache so each frame becomes a single DMA-friendly
+    write.  The kernel rejects unaligned buffers with EINVAL; in that case
+    O_DIRECT is cleared on the fd and the write is retried through the page
+    cache.  The file is pre-allocated for the expected capture size and
+    truncated to the bytes actually written on close.
+    """
+
+    def __init__(self, path: str, expected_bytes: int) -> None:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        o_direct = getattr(os, "O_DIRECT", 0)
+        fd = None
+        if o_direct:
+            try:
+                fd = os.open(path, flags | o_direct, 0o644)
+            except OSError as exc:
+                if exc.errno != errno.EINVAL:
+                    raise
+        if fd is None:
+            fd = os.open(path, flags, 0o644)
+        self._fd = fd
+        self._owns_fd = True
+        self._written = 0
+        if expected_bytes > 0 and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, expected_bytes)
+            except OSError:
+                # Pre-allocation is an optimization only.
+                pass
+
+    @classmethod
+    def from_fd(cls, fd: int) -> "_RawFileOutput":
+        """Wrap an already open fd (e.g. stdout) without taking ownership."""
+        self = cls.__new__(cls)
+        self._fd = fd
+        self._owns_fd = False
+        self._written = 0
+        return self
+
+    def _disable_direct_io(self) -> bool:
+        o_direct = getattr(os, "O_DIRECT", 0)
+        flags = fcntl.fcntl(self._fd, fcntl.F_GETFL)
+        if not o_direct or not flags & o_direct:
+            return False
+        fcntl.fcntl(self._fd, fcntl.F_SETFL, flags & ~o_direct)
+        return True
+
+    def write(self, data) -> None:
+        view = memoryview(data).cast("B")
+        while view:
+            try:
+                n = os.write(self._fd, view)
+            except OSError as exc:
+                if exc.errno == errno.EINVAL and self._disable_direct_io():
+                    continue
+                raise
+            self._written += n
+            view = view[n:]
+
+    def writev(self, buffers) -> None:
+        """Write several buffers with as few os.writev calls as possible."""
+        views = [memoryview(b).cast("B") for b in buffers]
+        while views:
+            try:
+                n = os.writev(self._fd, views)
+            except OSError as exc:
+                if exc.errno == errno.EINVAL and self._disable_direct_io():
+                    continue
+                raise
+            self._written += n
+            # Drop what was written; a short write may end mid-buffer.
+            while views and n >= views[0].nbytes:
+                n -= views[0].nbytes
+                views.pop(0)
+            if n:
+                views[0] = views[0][n:]
+
+    def flush(self) -> None:
+        # os.write is unbuffered; nothing is held in user space.
+        return
+
+    def close(self) -> None:
+        if self._fd < 0:
+            return
+        if not self._owns_fd:
+            self._fd = -1
+            return
+        try:
+            os.ftruncate(self._fd, self._written)
+        finally:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class _AsyncFrameWriter:
+    """Writes captured frames on a background thread.
+
+    Each submitted sink buffer is copied into a scratch buffer and released
+    back to the driver straight away, so a slow write never holds sink
+    buffers out of the pool.  The writer thread writes the scratch copy and
+    returns it to a free list.  At most ``depth`` copies are waiting on top
+    of the one being written; submission blocks once all scratch buffers
+    are in use, which gives natural back-pressure.
+    """
+
+    def __init__(self, output_stream, depth: int) -> None:
+        self._stream = output_stream
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        # Scratch buffers are anonymous mmaps, which are page aligned and so
+        # also suit an O_DIRECT output.  They are allocated on demand up to
+        # ``depth + 1`` and recycled through ``_free``.
+        self._free: queue.SimpleQueue = queue.SimpleQueue()
+        self._spare = depth + 1
+        self.error: Exception | None = None
+        self._thread = threading.Thread(target=self._run, name="RawWriter", daemon=True)
+        self._thread.start()
+
+    def _take_scratch(self, nbytes: int) -> mmap.mmap:
+        if self._spare > 0 and self._free.empty():
+            self._spare -= 1
+            return mmap.mmap(-1, nbytes)
+        scratch = self._free.get()
+        if len(scratch) < nbytes:
+            scratch.close()
+            scratch = mmap.mmap(-1, nbytes)
+        return scratch
+
+    def submit(self, buf: ic4.ImageBuffer) -> None:
+        try:
+            # For BayerGR8 the array has shape (height, width, 1) and is
+            # C-contiguous, so it can be copied as a flat byte view.
+            src = memoryview(buf.numpy_wrap()).cast("B")
+            nbytes = src.nbytes
+            scratch = self._take_scratch(nbytes)
+            scratch[:nbytes] = src
+            src.release()
+        finally:
+            buf.release()
+        self._queue.put((scratch, nbytes))
+
+    def _run(self) -> None:
+        writev = self._stream.writev
+        flush = self._stream.flush
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        recycle = self._free.put
+        done = False
+        while not done:
+            # Coalesce whatever is already queued, up to WRITEV_BATCH frames,
+            # into a single writev call.
+            batch = []
+            item = get()
+            while True:
+                if item is None:
+                    done = True
+                    break
+                batch.append(item)
+                if len(batch) >= WRITEV_BATCH:
+                    break
+                try:
+                    item = get_nowait()
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+            views = [memoryview(scratch)[:nbytes] for scratch, nbytes in batch]
+            try:
+                if self.error is None:
+                    writev(views)
+                    flush()
+            except (OSError, ValueError) as exc:
+                self.error = exc
+            finally:
+                for view in views:
+                    view.release()
+                for scratch, _ in batch:
+                    recycle(scratch)
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+
 def record_raw_frames(
     grabber: ic4.Grabber,
     sink: ic4.QueueSink,
     duration_sec: float,
     output_stream,
+    frame_ready: threading.Event,
     fps: float = 30.0,
+    write_depth: int = DEFAULT_NUM_BUFFERS,
 ) -> None:
     grabber.acquisition_start()
+    writer = _AsyncFrameWriter(output_stream, write_depth)
+    pin = _BufferPinner().pin
 
     trigger_cmd = None
     try:
@@ -120,44 +359,71 @@ def record_raw_frames(
     # Compute an inter‑trigger delay to approximate the desired frame rate
     inter_trigger = 1.0 / fps if fps > 0 else 0.0
 
-    # Stream frame bytes directly to the provided binary output.
-    while datetime.now() < end_time:
-        start_trigger = time.perf_counter()
+    # Bind per-frame attribute lookups to locals once; the loop below
+    # runs for every frame of the capture.
+    pop = sink.try_pop_output_buffer
+    perf = time.perf_counter
+    sleep = time.sleep
+    submit = writer.submit
+    fire = trigger_cmd.execute if trigger_cmd is not None else None
+    clear_ready = frame_ready.clear
+    wait_ready = frame_ready.wait
+
+    # Triggers are paced on a fixed ladder of deadlines rather than by
+    # sleeping "interval - elapsed" each frame, so sleep over/undershoot
+    # does not accumulate into drift over long captures.
+    next_trigger = perf()
+
+    # Stream frame bytes to the provided binary output via the writer.
+    while datetime.now() < end_time and writer.error is None:
         # Issue a software trigger if supported.  The trigger command
         # will return immediately; the camera will respond by
         # generating a single frame.
-        if trigger_cmd is not None:
+        if fire is not None:
             try:
-                trigger_cmd.execute()
+                fire()
             except ic4.IC4Exception:
                 pass
 
+        # QueueSink.pop_output_buffer() has no timeout, so block on the
+        # listener's frames_queued notification instead of sleeping in
+        # 1 ms steps.  The event is cleared before each pop so a frame
+        # queued in between is never missed.
         buf = None
-        deadline = time.perf_counter() + 2.0  # seconds
-        while buf is None and time.perf_counter() < deadline:
-            buf = sink.try_pop_output_buffer()
-            if buf is None:
-                time.sleep(0.001)
+        deadline = perf() + 2.0  # seconds
+        while True:
+            clear_ready()
+            buf = pop()
+            if buf is not None:
+                break
+            wait_sec = deadline - perf()
+            if wait_sec <= 0:
+                break
+            wait_ready(wait_sec)
         if buf is None:
             # No frame arrived within the deadline; continue without writing.
             continue
-        # Convert the image buffer into a NumPy array without copying and
-        # stream its raw bytes immediately. For BayerGR8 the array has
-        # shape (height, width, 1) and dtype uint8.
-        arr = buf.numpy_wrap()
-        output_stream.write(arr.tobytes())
-        output_stream.flush()
-        # Release the buffer back to the sink so it can be reused
-        buf.release()
-        # Delay before sending the next trigger to roughly match the
-        # desired frame rate.  The time spent retrieving the buffer is
-        # included in the measured duration, so only sleep if there's
-        # time left.  When the loop is close to the end time, we break
-        # without further delays.
-        elapsed = time.perf_counter() - start_trigger
-        remaining = inter_trigger - elapsed
-        if remaining > 0 and datetime.now() + timedelta(seconds=remaining) < end_time:
-            time.sleep(remaining)
+        pin(buf)
+        # Hand the buffer to the writer; it copies the frame and releases
+        # the buffer back to the sink before the write starts.
+        submit(buf)
+        # Sleep until the next deadline on the ladder.  If this frame
+        # overran its slot, restart the ladder from now instead of firing
+        # a burst of triggers to catch up.  Near the end time no further
+        # delay is added.
+        next_trigger += inter_trigger
+        now = perf()
+        remaining = next_trigger - now
+        if remaining <= 0:
+            next_trigger = now
+        elif datetime.now() + timedelta(seconds=remaining) < end_time:
+            sleep(remaining)
+
+    # Drain in-flight writes before stopping the stream so every captured
+    # frame reaches the output.
+    writer.close()
+    if writer.error is not None:
+        print(f"Output write failed: {writer.error}", file=sys.stderr)
 
     # Stop acquisition and the data stream.  Always stop the
     # acquisition before closing the device to release resources.
@@ -171,8 +437,25 @@ def record_raw_frames(
         pass
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Write raw frames to this file (O_DIRECT) instead of stdout",
+    )
+    parser.add_argument(
+        "--num-buffers",
+        type=int,
+        default=DEFAULT_NUM_BUFFERS,
+        help=f"Number of sink buffers (default: {DEFAULT_NUM_BUFFERS})",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
     """Main entry point for raw frame capture."""
+    args = parse_args()
     # Settings for capture.  Adjust these constants as needed.
     SERIAL_NUMBER = "05520126"
     WIDTH, HEIGHT = 1920, 1080
@@ -187,6 +470,7 @@ def main() -> None:
     sink = None
     sink_listener = None
     device_info = None
+    raw_output = None
     try:
         # Locate the camera by serial number and open it
         device_info = find_device_by_serial(SERIAL_NUMBER)
@@ -194,16 +478,30 @@ def main() -> None:
         # Configure resolution, pixel format, frame rate and trigger
         configure_camera_for_bayer_gr8(grabber, WIDTH, HEIGHT, FRAME_RATE)
         # Set up queue sink and allocate buffers
-        sink, sink_listener = allocate_queue_sink(grabber, WIDTH, HEIGHT)
+        sink, sink_listener = allocate_queue_sink(grabber, WIDTH, HEIGHT, args.num_buffers)
+        if args.output:
+            expected_frames = int(CAPTURE_DURATION * FRAME_RATE)
+            raw_output = _RawFileOutput(args.output, WIDTH * HEIGHT * expected_frames)
+            output_stream = raw_output
+        else:
+            # Write straight to the stdout fd so frames can be batched with
+            # writev; nothing else is written through sys.stdout.buffer.
+            sys.stdout.flush()
+            raw_output = _RawFileOutput.from_fd(sys.stdout.fileno())
+            output_stream = raw_output
         # Record raw frames
         record_raw_frames(
             grabber,
             sink,
             CAPTURE_DURATION,
-            sys.stdout.buffer,
+            output_stream,
+            sink_listener.frame_ready,
             fps=FRAME_RATE,
+            write_depth=args.num_buffers,
         )
     finally:
+        if raw_output is not None:
+            raw_output.close()
         # Ensure the camera and library are cleanly closed
         try:
             if grabber.is_device_open:
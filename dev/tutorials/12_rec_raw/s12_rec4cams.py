@@ -1,6 +1,10 @@
 import argparse
-import csv
+import concurrent.futures
+import ctypes
+import fcntl
+import functools
 import os
+import queue
 import re
 import shutil
 import struct
@@ -8,16 +12,22 @@ import subprocess
 import sys
 import time
 import threading
-from datetime import datetime, timezone
 from itertools import count
-from typing import BinaryIO, Dict, Iterable, List, Optional
+from typing import BinaryIO, Dict, Iterable, List, Optional, TextIO
 import gc
 
+import numpy as np
+
 # Raw file format constants
 SRAW_MAGIC = b'SRAW'
 FRAM_MAGIC = b'FRAM'
 SRAW_VERSION = 1
 
+# FileHeader: magic(4) + version(4) + serial(16) + start_ns(8) + width(2) + height(2) + pixel_format(2) + reserved(2)
+FILE_HEADER_STRUCT = struct.Struct('<4sI16sqHHHH')
+# FrameHeader: magic(4) + payload_size(4) + frame_index(8) + timestamp_ns(8)
+FRAME_HEADER_STRUCT = struct.Struct('<4sIQq')
+
 # PixelFormat enum
 PIXEL_FORMAT_BAYER_GR8 = 0
 PIXEL_FORMAT_BAYER_GR16 = 1
@@ -26,6 +36,16 @@ PIXEL_FORMAT_BGR8 = 2
 # File splitting
 DEFAULT_FRAMES_PER_FILE = 1000
 
+# SCHED_FIFO priority of the capture threads (1-99).
+CAPTURE_THREAD_PRIORITY = 20
+# Sink buffers per camera (~17 s of headroom at 30 fps).
+SINK_NUM_BUFFERS = 500
+
+# Per-camera CSV: rows are formatted by hand (same text and CRLF endings as
+# csv.writer would produce) and written in batches of CSV_BATCH_ROWS.
+CSV_HEADER = "frame_number,device_timestamp_ns\r\n"
+CSV_BATCH_ROWS = 64
+
 try:
     # The imagingcontrol4 library is provided by The Imaging Source.  It
     # exposes a GenTL based API for controlling industrial cameras.  See
@@ -41,14 +61,6 @@ except ImportError as exc:  # pragma: no cover
 SERIAL_NUMBERS = ["05520125", "05520126", "05520128", "05520129"]
 
 
-def find_device_by_serial(serial: str) -> ic4.DeviceInfo:
-    devices = ic4.DeviceEnum.devices()
-    for dev in devices:
-        if getattr(dev, "serial", None) == serial:
-            return dev
-    raise RuntimeError(f"Camera with serial {serial!r} not found")
-
-
 def log_warning(serial: str, message: str, exc: Optional[Exception] = None) -> None:
     if exc is not None:
         sys.stderr.write(f"[{serial}] Warning: {message}: {exc}\n")
@@ -57,8 +69,10 @@ def log_warning(serial: str, message: str, exc: Optional[Exception] = None) -> N
 
 
 _PMC_COUNTER = count()
+_STEPS_REMOVED_RE = re.compile(r"stepsRemoved\s*=?\s*(\d+)")
 
 
+@functools.lru_cache(maxsize=1)
 def _find_pmc_path() -> Optional[str]:
     preferred = "/usr/sbin/pmc"
     if os.path.exists(preferred):
@@ -102,7 +116,7 @@ def _ptp_precheck() -> None:
     if not ok:
         sys.stderr.write(f"[PTP] Warning: pre-check skipped ({out.strip()})\n")
         return
-    m = re.search(r"stepsRemoved\s*=?\s*(\d+)", out)
+    m = _STEPS_REMOVED_RE.search(out)
     if not m:
         sys.stderr.write("[PTP] Warning: could not parse stepsRemoved\n")
         return
@@ -122,10 +136,22 @@ def _find_camera_property(pm: ic4.PropertyMap, names: Iterable[str]):
     return None
 
 
-def _ensure_camera_ptp_enabled(grabber: ic4.Grabber) -> None:
-    prop = _find_camera_property(
-        grabber.device_property_map, ["PtpEnable", "GevIEEE1588Enable"]
-    )
+def _resolve_ptp_props(ctx: Dict[str, object]) -> None:
+    """Look up the camera's PTP enable/status properties once.
+
+    pm.find() reports a missing name by raising, so the handles are stored
+    in the camera context instead of being searched again on every poll.
+    """
+    grabber = ctx.get("grabber")
+    if not isinstance(grabber, ic4.Grabber):
+        return
+    pm = grabber.device_property_map
+    ctx["ptp_enable_prop"] = _find_camera_property(pm, ["PtpEnable", "GevIEEE1588Enable"])
+    ctx["ptp_status_prop"] = _find_camera_property(pm, ["PtpStatus", "GevIEEE1588Status"])
+
+
+def _ensure_camera_ptp_enabled(ctx: Dict[str, object]) -> None:
+    prop = ctx.get("ptp_enable_prop")
     if prop is None:
         return
     try:
@@ -135,10 +161,7 @@ def _ensure_camera_ptp_enabled(grabber: ic4.Grabber) -> None:
         pass
 
 
-def _get_camera_ptp_status(grabber: ic4.Grabber) -> Optional[str]:
-    prop = _find_camera_property(
-        grabber.device_property_map, ["PtpStatus", "GevIEEE1588Status"]
-    )
+def _get_camera_ptp_status(prop) -> Optional[str]:
     if prop is None:
         return None
     try:
@@ -157,11 +180,10 @@ def _wait_for_cameras_slave(camera_contexts: Dict[str, Dict[str, object]]) -> No
         master_count = 0
         other_count = 0
         for serial, ctx in camera_contexts.items():
-            grabber = ctx.get("grabber")
-            if not isinstance(grabber, ic4.Grabber):
+            if not isinstance(ctx.get("grabber"), ic4.Grabber):
                 other_count += 1
                 continue
-            status = _get_camera_ptp_status(grabber)
+            status = _get_camera_ptp_status(ctx.get("ptp_status_prop"))
             if status == "Slave":
                 slave_count += 1
             elif status == "Master":
@@ -180,6 +202,83 @@ def _wait_for_cameras_slave(camera_contexts: Dict[str, Dict[str, object]]) -> No
         time.sleep(poll_interval)
 
 
+def _open_camera(
+    serial: str,
+    device_info: Optional[ic4.DeviceInfo],
+    width: int,
+    height: int,
+    fps: float,
+) -> Optional[Dict[str, object]]:
+    """Open one camera and apply its basic settings; returns its context or None."""
+    if device_info is None:
+        log_warning(serial, "device not found", RuntimeError(f"Camera with serial {serial!r} not found"))
+        return None
+
+    grabber = ic4.Grabber()
+    try:
+        grabber.device_open(device_info)
+    except ic4.IC4Exception as e:
+        log_warning(serial, "failed to open device", e)
+        return None
+
+    ctx: Dict[str, object] = {
+        "grabber": grabber,
+        "device_info": device_info,
+    }
+    _resolve_ptp_props(ctx)
+    _ensure_camera_ptp_enabled(ctx)
+    configure_camera_basic(serial, grabber, width, height, fps)
+    return ctx
+
+
+def _shutdown_camera(serial: str, ctx: Dict[str, object]) -> None:
+    """Finish one camera's ffmpeg process and close its device."""
+    ffmpeg_proc = ctx.get("ffmpeg_proc")  # type: ignore[assignment]
+    if isinstance(ffmpeg_proc, subprocess.Popen):
+        try:
+            if ffmpeg_proc.stdin and not ffmpeg_proc.stdin.closed:
+                ffmpeg_proc.stdin.close()
+        except Exception as e:
+            log_warning(serial, "failed to close ffmpeg stdin during cleanup", e)
+        try:
+            ffmpeg_proc.wait(timeout=FFMPEG_EXIT_TIMEOUT_S)
+        except subprocess.TimeoutExpired:
+            # A hung encoder must not block the rest of the shutdown.
+            log_warning(serial, "ffmpeg did not finish flushing; terminating")
+            ffmpeg_proc.terminate()
+            try:
+                ffmpeg_proc.wait(timeout=FFMPEG_TERMINATE_TIMEOUT_S)
+            except subprocess.TimeoutExpired:
+                log_warning(serial, "ffmpeg ignored SIGTERM; killing")
+                ffmpeg_proc.kill()
+                ffmpeg_proc.wait()
+        except Exception as e:
+            log_warning(serial, "ffmpeg wait failed during cleanup", e)
+    ctx.pop("ffmpeg_proc", None)
+
+    grabber = ctx.pop("grabber", None)
+    if isinstance(grabber, ic4.Grabber):
+        try:
+            grabber.acquisition_stop()
+        except ic4.IC4Exception as e:
+            log_warning(serial, "failed to stop acquisition during cleanup", e)
+        try:
+            grabber.stream_stop()
+        except ic4.IC4Exception as e:
+            log_warning(serial, "failed to stop stream during cleanup", e)
+        try:
+            if grabber.is_device_open:
+                grabber.device_close()
+        except ic4.IC4Exception as e:
+            log_warning(serial, "failed to close grabber device", e)
+
+    ctx.pop("sink", None)
+    ctx.pop("listener", None)
+    ctx.pop("device_info", None)
+    ctx.pop("ptp_enable_prop", None)
+    ctx.pop("ptp_status_prop", None)
+
+
 def _configure_and_schedule(
     camera_contexts: Dict[str, Dict[str, object]],
     start_delay_s: float,
@@ -187,43 +286,69 @@ def _configure_and_schedule(
     trigger_interval_fps: float,
 ) -> None:
     threshold_ns = int(threshold_ms * 1_000_000)
-    host_ref_before_ns = time.time_ns()
+    PropId = ic4.PropId
+    grabbers: Dict[str, ic4.Grabber] = {}
     for serial, ctx in camera_contexts.items():
         grabber = ctx.get("grabber")
         if not isinstance(grabber, ic4.Grabber):
             sys.stderr.write(f"[{serial}] Warning: grabber unavailable for offset scheduling\n")
             continue
+        grabbers[serial] = grabber
+
+    latch_id = PropId.TIMESTAMP_LATCH
+    latch_value_id = PropId.TIMESTAMP_LATCH_VALUE
+    # All cameras are the same model, so the getter that worked once is
+    # tried first on the rest instead of raising on every camera.
+    latch_getters = [("get_value_float", "get_value")]
+
+    def _trigger_latch(grabber: ic4.Grabber) -> Optional[Exception]:
         prop_map = grabber.device_property_map
         try:
             try:
-                prop_map.try_set_value(ic4.PropId.TIMESTAMP_LATCH, True)
+                prop_map.try_set_value(latch_id, True)
             except AttributeError:
-                prop_map.set_value(ic4.PropId.TIMESTAMP_LATCH, True)
+                prop_map.set_value(latch_id, True)
         except ic4.IC4Exception as exc:
-            sys.stderr.write(f"[{serial}] Warning: failed to trigger TIMESTAMP_LATCH: {exc}\n")
-    host_ref_after_ns = time.time_ns()
-    host_ref_ns = (host_ref_before_ns + host_ref_after_ns) // 2
-
-    deltas: Dict[str, int] = {}
-    violations: List[tuple[str, float]] = []
+            return exc
+        return None
 
-    for serial, ctx in camera_contexts.items():
-        grabber = ctx.get("grabber")
-        if not isinstance(grabber, ic4.Grabber):
-            sys.stderr.write(f"[{serial}] Warning: grabber unavailable for offset scheduling\n")
-            continue
+    def _read_latch(grabber: ic4.Grabber) -> object:
         prop_map = grabber.device_property_map
-        raw_value = None
-        for getter in (
-            lambda: prop_map.get_value_float(ic4.PropId.TIMESTAMP_LATCH_VALUE),
-            lambda: prop_map.get_value(ic4.PropId.TIMESTAMP_LATCH_VALUE),
-        ):
+        order = latch_getters[0]
+        for name in order:
             try:
-                raw_value = getter()
+                raw_value = getattr(prop_map, name)(latch_value_id)
             except ic4.IC4Exception:
                 continue
             if raw_value is not None:
-                break
+                if name != order[0]:
+                    latch_getters[0] = (name,) + tuple(n for n in order if n != name)
+                return raw_value
+        return None
+
+    # Latch all cameras from one thread each so the GenTL calls land close
+    # together: a serial loop widens the host reference bracket and ties
+    # each camera's error to its position in the list.
+    workers = max(1, len(grabbers))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        # Spin up every worker before the bracket so thread creation is
+        # not measured.
+        warmup = threading.Barrier(workers)
+        list(pool.map(lambda _: warmup.wait(), range(workers)))
+        host_ref_before_ns = time.time_ns()
+        latch_errors = list(pool.map(_trigger_latch, grabbers.values()))
+        host_ref_after_ns = time.time_ns()
+        raw_values = list(pool.map(_read_latch, grabbers.values()))
+    host_ref_ns = (host_ref_before_ns + host_ref_after_ns) // 2
+
+    for serial, exc in zip(grabbers, latch_errors):
+        if exc is not None:
+            sys.stderr.write(f"[{serial}] Warning: failed to trigger TIMESTAMP_LATCH: {exc}\n")
+
+    deltas: Dict[str, int] = {}
+    violations: List[tuple[str, float]] = []
+
+    for serial, raw_value in zip(grabbers, raw_values):
         if raw_value is None:
             sys.stderr.write(f"[{serial}] Warning: TIMESTAMP_LATCH_VALUE unavailable\n")
             continue
@@ -253,6 +378,7 @@ def _configure_and_schedule(
         sys.exit(2)
 
     host_target_ns = time.time_ns() + int(start_delay_s * 1_000_000_000)
+    interval_us = round(1_000_000 / trigger_interval_fps)
 
     for serial, ctx in camera_contexts.items():
         grabber = ctx.get("grabber")
@@ -264,40 +390,42 @@ def _configure_and_schedule(
             sys.stderr.write(f"[{serial}] Warning: missing delta for scheduling\n")
             continue
         camera_target_ns = host_target_ns + delta_ns
+        # Fetch the property map and its setters once per camera.
         prop_map = grabber.device_property_map
+        set_value = prop_map.set_value
+        try_set_value = prop_map.try_set_value
 
         # Trigger settings (before Action Scheduler)
         try:
-            prop_map.set_value(ic4.PropId.TRIGGER_SELECTOR, "FrameStart")
+            set_value(PropId.TRIGGER_SELECTOR, "FrameStart")
         except ic4.IC4Exception as e:
             sys.stderr.write(f"[{serial}] Warning: failed to set TRIGGER_SELECTOR: {e}\n")
         try:
-            prop_map.set_value(ic4.PropId.TRIGGER_SOURCE, "Action0")
+            set_value(PropId.TRIGGER_SOURCE, "Action0")
         except ic4.IC4Exception as e:
             sys.stderr.write(f"[{serial}] Warning: failed to set TRIGGER_SOURCE: {e}\n")
         try:
-            prop_map.set_value(ic4.PropId.TRIGGER_MODE, "On")
+            set_value(PropId.TRIGGER_MODE, "On")
         except ic4.IC4Exception as e:
             sys.stderr.write(f"[{serial}] Warning: failed to set TRIGGER_MODE: {e}\n")
 
         # Action Scheduler settings
         try:
-            prop_map.try_set_value(ic4.PropId.ACTION_SCHEDULER_CANCEL, True)
+            try_set_value(PropId.ACTION_SCHEDULER_CANCEL, True)
         except ic4.IC4Exception:
             pass
         try:
-            prop_map.set_value(ic4.PropId.ACTION_SCHEDULER_TIME, int(camera_target_ns))
+            set_value(PropId.ACTION_SCHEDULER_TIME, int(camera_target_ns))
         except ic4.IC4Exception as exc:
             sys.stderr.write(f"[PTP] Error: failed to set ACTION_SCHEDULER_TIME for serial={serial}: {exc}\n")
             sys.exit(2)
-        interval_us = round(1_000_000 / trigger_interval_fps)
         try:
-            prop_map.set_value(ic4.PropId.ACTION_SCHEDULER_INTERVAL, interval_us)
+            set_value(PropId.ACTION_SCHEDULER_INTERVAL, interval_us)
         except ic4.IC4Exception as exc:
             sys.stderr.write(f"[PTP] Error: failed to set ACTION_SCHEDULER_INTERVAL for serial={serial}: {exc}\n")
             sys.exit(2)
         try:
-            prop_map.try_set_value(ic4.PropId.ACTION_SCHEDULER_COMMIT, True)
+            try_set_value(PropId.ACTION_SCHEDULER_COMMIT, True)
         except ic4.IC4Exception as exc:
             sys.stderr.write(f"[PTP] Error: failed to commit scheduler for serial={serial}: {exc}\n")
             sys.exit(2)
@@ -335,7 +463,15 @@ def configure_camera_basic(
 
 
 class _RawQueueSinkListener(ic4.QueueSinkListener):
-    """Minimal listener that keeps the queue sink active."""
+    """Minimal listener that keeps the queue sink active.
+
+    ``frame_ready`` is set whenever the driver queues a frame, so the
+    capture loop can wait on it instead of polling the sink.
+    """
+
+    def __init__(self, frame_ready: threading.Event) -> None:
+        super().__init__()
+        self.frame_ready = frame_ready
 
     def sink_connected(
         self, sink: ic4.QueueSink, image_type: ic4.ImageType, min_buffers_required: int
@@ -343,37 +479,100 @@ class _RawQueueSinkListener(ic4.QueueSinkListener):
         return True
 
     def frames_queued(self, sink: ic4.QueueSink) -> None:  # pragma: no cover
-        return
+        self.frame_ready.set()
+
+
+class _BufferPinner:
+    """Locks each sink buffer into RAM with mlock the first time it is seen.
+
+    One mlock call per buffer, covering only that buffer's pages; the
+    locked ranges are remembered so unpin_all() can munlock them at
+    teardown.  Pinning is best effort: if mlock is unavailable or refused
+    (e.g. RLIMIT_MEMLOCK), a warning is logged once and capture continues
+    with pageable buffers.
+
+    This is not a prefault: a buffer is first seen after the driver has
+    filled it, so that first fill may still fault.  Pinning only keeps the
+    buffer resident for the rest of the capture.
+    """
+
+    def __init__(self, serial: str) -> None:
+        self._serial = serial
+        self._pinned: Dict[int, int] = {}
+        self._mlock = None
+        self._munlock = None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            mlock = libc.mlock
+            munlock = libc.munlock
+        except (OSError, AttributeError, TypeError):
+            return
+        for func in (mlock, munlock):
+            func.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+            func.restype = ctypes.c_int
+        self._mlock = mlock
+        self._munlock = munlock
+
+    def pin(self, arr: np.ndarray) -> None:
+        if self._mlock is None:
+            return
+        addr = arr.ctypes.data
+        if addr in self._pinned:
+            return
+        if self._mlock(addr, arr.nbytes) != 0:
+            err = ctypes.get_errno()
+            log_warning(self._serial, f"mlock failed ({os.strerror(err)}); sink buffers stay pageable")
+            self._mlock = None
+            return
+        self._pinned[addr] = arr.nbytes
+
+    def unpin_all(self) -> None:
+        """munlock every buffer pinned so far; call before the sink is freed."""
+        for addr, nbytes in self._pinned.items():
+            self._munlock(addr, nbytes)
+        self._pinned.clear()
 
 
 def allocate_queue_sink(
-    grabber: ic4.Grabber, width: int, height: int
+    grabber: ic4.Grabber, width: int, height: int, num_buffers: int = SINK_NUM_BUFFERS
 ) -> tuple[ic4.QueueSink, _RawQueueSinkListener]:
-    listener = _RawQueueSinkListener()
+    listener = _RawQueueSinkListener(threading.Event())
     sink = ic4.QueueSink(listener, accepted_pixel_formats=[ic4.PixelFormat.BayerGR8])
     grabber.stream_setup(
         sink,
         setup_option=ic4.StreamSetupOption.DEFER_ACQUISITION_START,
     )
-    sink.alloc_and_queue_buffers(500)
+    # Buffers are allocated for the type negotiated by stream_setup; make
+    # sure that is the configured image so nothing is reallocated later.
+    serial = getattr(grabber.device_info, "serial", "?")
+    try:
+        itype = sink.output_image_type
+        if (itype.width, itype.height) != (width, height):
+            log_warning(
+                serial,
+                f"sink negotiated {itype.width}x{itype.height}, expected {width}x{height}",
+            )
+    except ic4.IC4Exception as e:
+        log_warning(serial, "failed to query sink image type", e)
+    # The queued buffers are not reachable from Python until they come back
+    # filled, so they cannot be touched or mlocked here; _FrameWriter pins
+    # each one on its first use instead.
+    sink.alloc_and_queue_buffers(num_buffers)
     return sink, listener
 
 
-def write_file_header(
-    file: BinaryIO,
+def pack_file_header(
     serial: str,
     recording_start_ns: int,
     width: int,
     height: int,
     pixel_format: int,
-) -> None:
-    """Write FileHeader (40 bytes) to file."""
+) -> bytes:
+    """Pack FileHeader (40 bytes)."""
     # Prepare camera_serial as 16 bytes null-terminated ASCII
     serial_bytes = serial.encode('ascii')[:15].ljust(16, b'\x00')
 
-    # Pack: magic(4) + version(4) + serial(16) + start_ns(8) + width(2) + height(2) + pixel_format(2) + reserved(2)
-    header = struct.pack(
-        '<4sI16sqHHHH',
+    header = FILE_HEADER_STRUCT.pack(
         SRAW_MAGIC,
         SRAW_VERSION,
         serial_bytes,
@@ -383,25 +582,73 @@ def write_file_header(
         pixel_format,
         0,  # reserved
     )
-    file.write(header)
+    return header
 
 
-def write_frame_header(
-    file: BinaryIO,
-    payload_size: int,
-    frame_index: int,
-    timestamp_ns: int,
-) -> None:
-    """Write FrameHeader (24 bytes) to file."""
-    # Pack: magic(4) + payload_size(4) + frame_index(8) + timestamp_ns(8)
-    header = struct.pack(
-        '<4sIQq',
-        FRAM_MAGIC,
-        payload_size,
-        frame_index,
-        timestamp_ns,
-    )
-    file.write(header)
+def open_raw_fd(path: str) -> int:
+    """Open a raw file for writing as an unbuffered fd."""
+    return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+
+def write_all(fd: int, buffers) -> None:
+    """Write buffers to fd with os.writev, resuming after short writes.
+
+    ``buffers`` must be byte-formatted (bytes, bytearray or a memoryview
+    cast to "B") so that len() is the byte count.  The common case of a
+    complete write returns without building any views.
+    """
+    written = os.writev(fd, buffers)
+    remaining = sum(map(len, buffers)) - written
+    if remaining <= 0:
+        return
+    views = []
+    for b in buffers:
+        if written >= len(b):
+            written -= len(b)
+            continue
+        views.append(memoryview(b)[written:])
+        written = 0
+    while views:
+        n = os.writev(fd, views)
+        while views and n >= views[0].nbytes:
+            n -= views[0].nbytes
+            views.pop(0)
+        if n:
+            views[0] = views[0][n:]
+
+
+def format_csv_rows(rows: Iterable[tuple[int, int]]) -> str:
+    """Format buffered (frame_number, timestamp_ns) pairs as CSV text."""
+    return "".join([f"{frame_no:04},{timestamp}\r\n" for frame_no, timestamp in rows])
+
+
+_GC_LOCK = threading.Lock()
+_GC_PAUSE_DEPTH = 0
+_GC_WAS_ENABLED = False
+
+
+def _pause_gc() -> None:
+    """Disable cyclic GC while any capture loop is running.
+
+    Capture threads for all cameras and main (around the whole capture
+    phase) share the one collector, so it is reference counted: only the
+    last holder to finish re-enables it and runs the deferred collection.
+    """
+    global _GC_PAUSE_DEPTH, _GC_WAS_ENABLED
+    with _GC_LOCK:
+        if _GC_PAUSE_DEPTH == 0:
+            _GC_WAS_ENABLED = gc.isenabled()
+            gc.disable()
+        _GC_PAUSE_DEPTH += 1
+
+
+def _resume_gc() -> None:
+    global _GC_PAUSE_DEPTH
+    with _GC_LOCK:
+        _GC_PAUSE_DEPTH -= 1
+        if _GC_PAUSE_DEPTH == 0 and _GC_WAS_ENABLED:
+            gc.enable()
+            gc.collect()
 
 
 def make_raw_split_filename(output_dir: str, serial: str, start_frame: int) -> str:
@@ -409,6 +656,610 @@ def make_raw_split_filename(output_dir: str, serial: str, start_frame: int) -> s
     return os.path.join(output_dir, f"cam{serial}_{start_frame:06d}.raw")
 
 
+# sync_file_range(2) flags.
+SYNC_FILE_RANGE_WAIT_BEFORE = 1
+SYNC_FILE_RANGE_WRITE = 2
+SYNC_FILE_RANGE_WAIT_AFTER = 4
+# fallocate(2) mode: reserve blocks without changing the file size.
+FALLOC_FL_KEEP_SIZE = 1
+# Start writeback of a raw file every this many newly written bytes.
+WRITEBACK_CHUNK_BYTES = 32 * 1024 * 1024
+# Period of the per-camera [MONITOR] lines printed during capture.
+MONITOR_INTERVAL_S = 1.0
+# Batch write durations kept per camera for the end-of-run p99; older
+# ones are overwritten.
+WRITE_NS_HISTORY = 65536
+# How long ffmpeg may take to flush after stdin is closed, and to exit
+# after SIGTERM, before it is terminated or killed during cleanup.
+FFMPEG_EXIT_TIMEOUT_S = 10.0
+FFMPEG_TERMINATE_TIMEOUT_S = 5.0
+# Most queued frames handed to ffmpeg in one writev.
+FFMPEG_WRITEV_BATCH = 8
+# Minimum requested capacity of each ffmpeg stdin pipe (Linux default is
+# 64 KiB); two frames are asked for when that is larger.
+FFMPEG_PIPE_BYTES = 1024 * 1024
+# Upper limit for unprivileged pipe sizes.
+PIPE_MAX_SIZE_PATH = "/proc/sys/fs/pipe-max-size"
+# fcntl.F_SETPIPE_SZ/F_GETPIPE_SZ are only exposed from Python 3.10.
+F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+F_GETPIPE_SZ = getattr(fcntl, "F_GETPIPE_SZ", 1032)
+
+
+def _load_sync_file_range():
+    """Return libc's sync_file_range via ctypes, or None if unavailable."""
+    try:
+        func = ctypes.CDLL(None, use_errno=True).sync_file_range
+    except (OSError, AttributeError, TypeError):
+        return None
+    func.argtypes = (ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong, ctypes.c_uint)
+    func.restype = ctypes.c_int
+    return func
+
+
+_sync_file_range = _load_sync_file_range()
+
+
+def _load_fallocate():
+    """Return libc's fallocate via ctypes, or None if unavailable."""
+    try:
+        func = ctypes.CDLL(None, use_errno=True).fallocate
+    except (OSError, AttributeError, TypeError):
+        return None
+    func.argtypes = (ctypes.c_int, ctypes.c_int, ctypes.c_longlong, ctypes.c_longlong)
+    func.restype = ctypes.c_int
+    return func
+
+
+_fallocate = _load_fallocate()
+
+
+def _preallocate(fd: int, length: int) -> None:
+    """Reserve disk blocks for a raw file up front (best effort).
+
+    The file size is left unchanged, so a recording that stops early, or
+    a crash, never leaves zero padding after the last frame.
+    """
+    if _fallocate is None or length <= 0:
+        return
+    # Advisory only: without the reservation the filesystem simply
+    # allocates blocks as the writes arrive.
+    _fallocate(fd, FALLOC_FL_KEEP_SIZE, 0, length)
+
+
+def _fadvise(fd: int, advice_name: str) -> None:
+    """Apply a whole-file posix_fadvise hint if the platform supports it."""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        # Advisory only.
+        pass
+
+
+def _pipe_size(fd: int) -> int:
+    """Return a pipe's kernel buffer size in bytes, or 0 if unknown."""
+    try:
+        return fcntl.fcntl(fd, F_GETPIPE_SZ)
+    except OSError:
+        return 0
+
+
+def _grow_pipe(serial: str, fd: int, frame_bytes: int) -> int:
+    """Enlarge a pipe's kernel buffer to hold two frames; return its size.
+
+    With the default 64 KiB buffer every frame is pushed through in many
+    small chunks, each waking ffmpeg, and the writer blocks on every frame.
+    Without CAP_SYS_RESOURCE the size is capped at pipe-max-size, so that
+    is used when two frames do not fit.
+    """
+    wanted = max(FFMPEG_PIPE_BYTES, 2 * frame_bytes)
+    try:
+        fcntl.fcntl(fd, F_SETPIPE_SZ, wanted)
+    except PermissionError:
+        try:
+            with open(PIPE_MAX_SIZE_PATH, "r", encoding="ascii") as f:
+                limit = int(f.read())
+            if limit < wanted:
+                fcntl.fcntl(fd, F_SETPIPE_SZ, limit)
+        except (OSError, ValueError) as e:
+            log_warning(serial, "failed to enlarge ffmpeg stdin pipe", e)
+    except OSError as e:
+        log_warning(serial, "failed to enlarge ffmpeg stdin pipe", e)
+    return _pipe_size(fd)
+
+
+def _physical_core(cpu: int) -> tuple[int, int]:
+    """Return (package, core) of a logical CPU, or a unique key if unknown."""
+    topology = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+    try:
+        with open(f"{topology}/physical_package_id", "r", encoding="ascii") as f:
+            package = int(f.read())
+        with open(f"{topology}/core_id", "r", encoding="ascii") as f:
+            core = int(f.read())
+    except (OSError, ValueError):
+        return (-1, cpu)
+    return (package, core)
+
+
+def _available_cpus() -> List[int]:
+    """Return usable CPUs, one per physical core first, SMT siblings after.
+
+    Taking CPUs from the front of this list therefore lands on distinct
+    physical cores for as long as there are any.
+    """
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return []
+    seen = set()
+    primaries: List[int] = []
+    siblings: List[int] = []
+    for cpu in cpus:
+        core = _physical_core(cpu)
+        if core in seen:
+            siblings.append(cpu)
+        else:
+            seen.add(core)
+            primaries.append(cpu)
+    return primaries + siblings
+
+
+def _pin_current_thread(serial: str, cpu: Optional[int]) -> None:
+    """Pin the calling thread to one CPU (Linux only; best effort)."""
+    if cpu is None:
+        return
+    try:
+        # On Linux, pid 0 addresses the calling thread rather than the
+        # whole process.
+        os.sched_setaffinity(0, {cpu})
+    except (AttributeError, OSError) as e:
+        log_warning(serial, f"failed to pin thread to CPU {cpu}", e)
+
+
+def _raise_thread_priority(serial: str, priority: int) -> None:
+    """Move the calling thread to SCHED_FIFO (Linux only; best effort).
+
+    Needs CAP_SYS_NICE or an RLIMIT_RTPRIO allowance; without either the
+    thread keeps its normal priority and a warning is logged.
+    """
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except (AttributeError, OSError) as e:
+        log_warning(serial, f"failed to set SCHED_FIFO priority {priority}", e)
+
+
+def _reset_thread_priority(serial: str) -> None:
+    """Move the calling thread back to SCHED_OTHER (Linux only).
+
+    Threads inherit their creator's policy, so one started from a capture
+    thread would otherwise run at SCHED_FIFO as well.
+    """
+    try:
+        if os.sched_getscheduler(0) != os.SCHED_OTHER:
+            os.sched_setscheduler(0, os.SCHED_OTHER, os.sched_param(0))
+    except AttributeError:
+        pass
+    except OSError as e:
+        log_warning(serial, "failed to reset thread to SCHED_OTHER", e)
+
+
+class _FrameWriter:
+    """Writes one camera's popped frames on a dedicated thread.
+
+    The capture loop only pops buffers and hands them over with submit(),
+    so a disk or pipe stall never delays the next pop.  All per-frame
+    bookkeeping happens here as well: the writer reads the metadata, logs
+    the CSV row, owns the raw file rotation state, writes each frame
+    straight from the driver buffer and releases the buffer once its write
+    has returned.  In-flight
+    frames are bounded by the sink's buffer pool.  After a write error the
+    writer releases any remaining buffers without writing them and exposes
+    the error via ``error``.
+    """
+
+    def __init__(
+        self,
+        serial: str,
+        output_stream: Optional[BinaryIO],
+        raw_mode: bool,
+        output_dir: str,
+        width: int,
+        height: int,
+        frames_per_file: int,
+        cpu: Optional[int] = None,
+        csv_file: Optional[TextIO] = None,
+    ) -> None:
+        self._serial = serial
+        self._cpu = cpu
+        self._output_stream = output_stream
+        self._raw_mode = raw_mode
+        self._output_dir = output_dir
+        self._width = width
+        self._height = height
+        self._frames_per_file = frames_per_file
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._raw_fd: Optional[int] = None
+        # Frame number at which the next split file starts; compared instead
+        # of taking frames_written % frames_per_file on every frame.
+        self._next_rotate_at = 0
+        # Bytes written to the current raw file, and how many of them have
+        # already been handed to the kernel for writeback.
+        self._file_bytes = 0
+        self._writeback_bytes = 0
+        # FrameHeader scratch, repacked in place for every frame; writes are
+        # synchronous on this thread, so one buffer is enough.
+        self._frame_header = bytearray(FRAME_HEADER_STRUCT.size)
+        self._csv_file = csv_file
+        self._csv_rows: List[tuple[int, int]] = []
+        self._csv_flush_count = 0
+        self.frames_written = 0
+        self.files_created: List[str] = []
+        self.error: Optional[Exception] = None
+        # Sink buffers are mlocked as the writer first meets them and
+        # unlocked again in close().
+        self._pinner = _BufferPinner(serial)
+        # Diagnostics read by _CaptureMonitor: the largest number of frames
+        # waiting to be written, the longest batch write overall and since
+        # the last take_recent_write_max_ns(), and a ring of the latest
+        # WRITE_NS_HISTORY batch write durations for the p99.
+        self.max_backlog = 0
+        self.write_max_ns = 0
+        self._recent_write_max_ns = 0
+        self._write_ns = np.zeros(WRITE_NS_HISTORY, dtype=np.int64)
+        self._write_count = 0
+        self._stats_lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._run, name=f"WriterThread-{serial}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, buf: ic4.ImageBuffer) -> None:
+        self._queue.put(buf)
+
+    def backlog(self) -> int:
+        """Frames submitted but not yet picked up by the writer thread."""
+        return self._queue.qsize()
+
+    def take_recent_write_max_ns(self) -> int:
+        """Return the longest batch write since the previous call and reset it."""
+        with self._stats_lock:
+            recent = self._recent_write_max_ns
+            self._recent_write_max_ns = 0
+        return recent
+
+    def write_p99_ns(self) -> float:
+        """99th percentile of the latest WRITE_NS_HISTORY batch writes (0 if none)."""
+        n = min(self._write_count, self._write_ns.size)
+        return float(np.percentile(self._write_ns[:n], 99)) if n else 0.0
+
+    def _record_write(self, elapsed_ns: int) -> None:
+        self._write_ns[self._write_count % WRITE_NS_HISTORY] = elapsed_ns
+        self._write_count += 1
+        if elapsed_ns > self.write_max_ns:
+            self.write_max_ns = elapsed_ns
+        with self._stats_lock:
+            if elapsed_ns > self._recent_write_max_ns:
+                self._recent_write_max_ns = elapsed_ns
+
+    def close(self) -> None:
+        """Write all submitted frames, stop the thread and close the output.
+
+        Closing ffmpeg's stdin here, as soon as this camera's last frame is
+        written, lets its encoder flush while other cameras are still
+        draining instead of waiting for the final cleanup.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        self._pinner.unpin_all()
+        if self._raw_fd is not None:
+            try:
+                self._close_raw_file()
+            except OSError:
+                pass
+        if not self._raw_mode and self._output_stream is not None:
+            try:
+                self._output_stream.close()
+            except OSError as e:
+                log_warning(self._serial, "failed to close ffmpeg stdin", e)
+
+    def _start_writeback(self) -> None:
+        """Queue the not yet submitted tail of the raw file for writeback.
+
+        SYNC_FILE_RANGE_WRITE only starts the I/O and returns, so disk
+        writes overlap with capture instead of piling up as dirty pages
+        that the kernel later flushes in one stall.
+        """
+        pending = self._file_bytes - self._writeback_bytes
+        if _sync_file_range is None or pending <= 0:
+            return
+        _sync_file_range(self._raw_fd, self._writeback_bytes, pending, SYNC_FILE_RANGE_WRITE)
+        self._writeback_bytes = self._file_bytes
+
+    def _close_raw_file(self) -> None:
+        """Wait for the file's outstanding writeback, drop its pages and close it.
+
+        A finished raw file is not read back during capture, so its page
+        cache is released right away; this bounds each camera's cache
+        footprint to roughly one file instead of letting it grow with the
+        whole recording.
+        """
+        fd = self._raw_fd
+        self._raw_fd = None
+        try:
+            # Truncating to the current size releases blocks reserved past
+            # the end of a file that was closed before it was full.
+            os.ftruncate(fd, self._file_bytes)
+            if _sync_file_range is not None:
+                _sync_file_range(
+                    fd,
+                    0,
+                    0,
+                    SYNC_FILE_RANGE_WAIT_BEFORE | SYNC_FILE_RANGE_WRITE | SYNC_FILE_RANGE_WAIT_AFTER,
+                )
+            # Only clean pages can be dropped, hence after the wait above.
+            _fadvise(fd, "POSIX_FADV_DONTNEED")
+        finally:
+            os.close(fd)
+
+    def _flush_csv(self) -> None:
+        try:
+            self._csv_file.write(format_csv_rows(self._csv_rows))
+            self._csv_rows.clear()
+            self._csv_flush_count += 1
+            print(f"[{self._serial}] CSV flush #{self._csv_flush_count}")
+        except Exception as e:
+            log_warning(self._serial, "failed to flush CSV buffer", e)
+
+    def _run(self) -> None:
+        # Created by the SCHED_FIFO capture thread; writes block on disk
+        # and pipe I/O and must not compete with the pops at that priority.
+        _reset_thread_priority(self._serial)
+        _pin_current_thread(self._serial, self._cpu)
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        qsize = self._queue.qsize
+        # Raw frames each need their own header and may cross a file
+        # boundary, so only the ffmpeg stream is written in batches.  A
+        # batch may be larger than the pipe: a blocking writev returns only
+        # once ffmpeg has taken all of it, still one syscall per batch.
+        batch_limit = 1 if self._raw_mode else FFMPEG_WRITEV_BATCH
+        batch: List[ic4.ImageBuffer] = []
+        while True:
+            buf = get()
+            stop = buf is None
+            if not stop:
+                batch.append(buf)
+                # Take whatever else is already queued, without waiting
+                # and never past the shutdown sentinel.
+                while len(batch) < batch_limit:
+                    try:
+                        buf = get_nowait()
+                    except queue.Empty:
+                        break
+                    if buf is None:
+                        stop = True
+                        break
+                    batch.append(buf)
+                pending = len(batch) + qsize()
+                if pending > self.max_backlog:
+                    self.max_backlog = pending
+                self._write_batch(batch)
+                batch.clear()
+            if stop:
+                if self._csv_rows:
+                    self._flush_csv()
+                return
+
+    def _write_batch(self, batch: List[ic4.ImageBuffer]) -> None:
+        csv_rows = self._csv_rows
+        pin = self._pinner.pin
+        payloads: List[memoryview] = []
+        started_ns = time.perf_counter_ns()
+        try:
+            for buf in batch:
+                md = buf.meta_data
+                timestamp = md.device_timestamp_ns
+                # Every popped frame gets its CSV row, even one that is
+                # dropped after a write error.
+                if self._csv_file is not None:
+                    csv_rows.append((md.device_frame_number, timestamp))
+                    if len(csv_rows) >= CSV_BATCH_ROWS:
+                        self._flush_csv()
+                if self.error is None:
+                    # Write straight from the driver buffer; buffers are
+                    # released only after the write has returned.
+                    arr = buf.numpy_wrap()
+                    pin(arr)
+                    payload = memoryview(arr).cast("B")
+                    if self._raw_mode:
+                        self._write_raw(payload, timestamp)
+                    else:
+                        payloads.append(payload)
+            if payloads:
+                self._write_stream(payloads)
+            if self.error is None:
+                self._record_write(time.perf_counter_ns() - started_ns)
+        except (OSError, ValueError) as e:
+            # Already logged with context by _write_raw/_write_stream.
+            self.error = e
+        except Exception as e:
+            log_warning(self._serial, "frame writer failed", e)
+            self.error = e
+        finally:
+            for buf in batch:
+                buf.release()
+
+    def _write_raw(self, payload: memoryview, timestamp: int) -> None:
+        serial = self._serial
+        frame_count = self.frames_written
+        # Check if we need to start a new file
+        if frame_count >= self._next_rotate_at or self._raw_fd is None:
+            frames_per_file = self._frames_per_file
+            self._next_rotate_at = frame_count + frames_per_file if frames_per_file > 0 else 1 << 62
+            # Close current file if open
+            if self._raw_fd is not None:
+                try:
+                    self._close_raw_file()
+                except OSError as e:
+                    log_warning(serial, "failed to close raw file", e)
+                # GC is paused during capture; a file rotation is already a
+                # slow moment, so sweep the young generation here.
+                gc.collect(0)
+
+            # Open new file
+            new_filename = make_raw_split_filename(self._output_dir, serial, frame_count)
+            try:
+                self._raw_fd = open_raw_fd(new_filename)
+                self._file_bytes = 0
+                _fadvise(self._raw_fd, "POSIX_FADV_SEQUENTIAL")
+                if frames_per_file > 0:
+                    _preallocate(
+                        self._raw_fd,
+                        FILE_HEADER_STRUCT.size
+                        + frames_per_file * (FRAME_HEADER_STRUCT.size + self._width * self._height),
+                    )
+                self._writeback_bytes = 0
+                self.files_created.append(new_filename)
+                print(f"[{serial}] New raw file: {new_filename}", file=sys.stderr)
+
+                # Write FileHeader
+                # Use current frame's timestamp as recording_start_ns for this file
+                write_all(
+                    self._raw_fd,
+                    (
+                        pack_file_header(
+                            serial,
+                            timestamp,
+                            self._width,
+                            self._height,
+                            PIXEL_FORMAT_BAYER_GR8,
+                        ),
+                    ),
+                )
+                self._file_bytes = FILE_HEADER_STRUCT.size
+            except OSError as e:
+                log_warning(serial, f"failed to open raw file {new_filename}", e)
+                raise
+
+        # Write FrameHeader + Payload in a single writev; the fd is
+        # unbuffered, so there is nothing to flush periodically.
+        header = self._frame_header
+        FRAME_HEADER_STRUCT.pack_into(header, 0, FRAM_MAGIC, payload.nbytes, frame_count, timestamp)
+        try:
+            write_all(self._raw_fd, (header, payload))
+        except (OSError, ValueError) as e:
+            log_warning(serial, "failed to write frame to raw file", e)
+            raise
+        self.frames_written = frame_count + 1
+        self._file_bytes += len(header) + payload.nbytes
+        if self._file_bytes - self._writeback_bytes >= WRITEBACK_CHUNK_BYTES:
+            self._start_writeback()
+
+    def _write_stream(self, payloads: List[memoryview]) -> None:
+        # ffmpeg's stdin is unbuffered, so the frames go from the driver
+        # buffers into the pipe in one writev, without an intermediate
+        # user-space copy.
+        try:
+            write_all(self._output_stream.fileno(), payloads)
+            self.frames_written += len(payloads)
+        except (OSError, ValueError) as e:
+            log_warning(self._serial, "failed to write frame to ffmpeg stdin", e)
+            raise
+
+
+def _stream_drops(grabber: object) -> Optional[int]:
+    """Return the frames a grabber's stream has lost so far, if known."""
+    try:
+        stats = grabber.stream_statistics  # type: ignore[attr-defined]
+        return (
+            stats.device_transmission_error
+            + stats.device_underrun
+            + stats.transform_underrun
+            + stats.sink_underrun
+        )
+    except (ic4.IC4Exception, AttributeError):
+        return None
+
+
+def _sink_free_buffers(sink: object) -> Optional[int]:
+    """Return how many buffers a sink has left for new frames, if known."""
+    try:
+        return sink.queue_sizes().free_queue_length  # type: ignore[attr-defined]
+    except (ic4.IC4Exception, AttributeError):
+        return None
+
+
+class _CaptureMonitor:
+    """Logs each camera's writer backlog, sink state and drops once a second.
+
+    Writers register themselves with add_writer() once capture starts.
+    stop() takes a final sample so summary() reports the end-of-run drop
+    counts next to the backlog high-water marks and write latencies.
+    """
+
+    def __init__(self, camera_contexts: Dict[str, Dict[str, object]]) -> None:
+        self._contexts = camera_contexts
+        self._writers: Dict[str, _FrameWriter] = {}
+        self._lock = threading.Lock()
+        self._drops: Dict[str, int] = {}
+        self._min_free: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="CaptureMonitor", daemon=True)
+
+    def add_writer(self, serial: str, writer: _FrameWriter) -> None:
+        with self._lock:
+            self._writers[serial] = writer
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._sample(log=False)
+
+    def _run(self) -> None:
+        while not self._stop.wait(MONITOR_INTERVAL_S):
+            self._sample(log=True)
+
+    def _sample(self, log: bool) -> None:
+        with self._lock:
+            writers = list(self._writers.items())
+        for serial, writer in writers:
+            ctx = self._contexts.get(serial, {})
+            drops = _stream_drops(ctx.get("grabber"))
+            if drops is not None:
+                self._drops[serial] = drops
+            free = _sink_free_buffers(ctx.get("sink"))
+            if free is not None:
+                self._min_free[serial] = min(free, self._min_free.get(serial, free))
+            recent_max_ns = writer.take_recent_write_max_ns()
+            if log:
+                print(
+                    f"[MONITOR] serial={serial} written={writer.frames_written} "
+                    f"backlog={writer.backlog()} sink_free={free} drops={drops} "
+                    f"write_max_ms={recent_max_ns / 1e6:.2f}",
+                    file=sys.stderr,
+                )
+
+    def summary(self, serial_order: List[str]) -> None:
+        for serial in serial_order:
+            writer = self._writers.get(serial)
+            if writer is None:
+                continue
+            p99_ms = writer.write_p99_ns() / 1e6
+            max_ms = writer.write_max_ns / 1e6
+            print(
+                f"[MONITOR] serial={serial} max_backlog={writer.max_backlog} "
+                f"min_sink_free={self._min_free.get(serial)} drops={self._drops.get(serial)} "
+                f"write_p99_ms={p99_ms:.2f} write_max_ms={max_ms:.2f}",
+                file=sys.stderr,
+            )
+
+
 def record_raw_frames(
     serial: str,
     grabber: ic4.Grabber,
@@ -422,10 +1273,10 @@ def record_raw_frames(
     width: int = 0,
     height: int = 0,
     frames_per_file: int = DEFAULT_FRAMES_PER_FILE,
-    csv_writer=None,
-    csv_buffer=None,
-    csv_file=None,
-    csv_flush_count=0,
+    frame_ready: Optional[threading.Event] = None,
+    writer_cpu: Optional[int] = None,
+    csv_file: Optional[TextIO] = None,
+    monitor: Optional[_CaptureMonitor] = None,
 ) -> int:
     # For MP4 mode, output_stream is required
     if not raw_mode and output_stream is None:
@@ -440,125 +1291,71 @@ def record_raw_frames(
 
     # Calculate end_time based on scheduled start time, not current time
     scheduled_end_ns = scheduled_start_ns + int(duration_sec * 1_000_000_000)
-    frame_count = 0
 
-    # For raw mode with headers
-    current_raw_file: Optional[BinaryIO] = None
-    current_file_start_frame = 0
-    recording_start_ns: Optional[int] = None
-    files_created: List[str] = []
+    writer = _FrameWriter(
+        serial, output_stream, raw_mode, output_dir, width, height, frames_per_file, writer_cpu, csv_file
+    )
+    if monitor is not None:
+        monitor.add_writer(serial, writer)
+
+    # The loop creates no reference cycles; keep cyclic GC from firing
+    # mid-capture and stalling the pops.
+    _pause_gc()
+
+    # Convert the wall-clock end into a monotonic deadline once.  While the
+    # sink is empty the deadline is only checked every 32 polls and ffmpeg
+    # every 100; a popped frame is always checked precisely so no frame
+    # past the end is recorded.
+    loop_end_ns = time.monotonic_ns() + (scheduled_end_ns - time.time_ns())
+    poll_counter = 0
+    next_ffmpeg_poll = 100
+
+    # Bind per-iteration attribute lookups to locals once; the loop below
+    # runs for every poll of the capture.
+    pop = sink.try_pop_output_buffer
+    mono_ns = time.monotonic_ns
+    submit = writer.submit
+    clear_ready = frame_ready.clear if frame_ready is not None else None
+    wait_ready = frame_ready.wait if frame_ready is not None else None
 
     try:
-        while time.time_ns() < scheduled_end_ns:
-            if ffmpeg_proc is not None and ffmpeg_proc.poll() is not None:
-                log_warning(serial, "ffmpeg terminated unexpectedly; stopping capture early")
+        while True:
+            poll_counter += 1
+            if not poll_counter & 31 and mono_ns() >= loop_end_ns:
                 break
+            if writer.error is not None:
+                break
+            if ffmpeg_proc is not None and poll_counter >= next_ffmpeg_poll:
+                next_ffmpeg_poll += 100
+                if ffmpeg_proc.poll() is not None:
+                    log_warning(serial, "ffmpeg terminated unexpectedly; stopping capture early")
+                    break
 
-            buf = sink.try_pop_output_buffer()
+            # Clear before popping so a frame queued in between still wakes
+            # the wait below.
+            if clear_ready is not None:
+                clear_ready()
+            buf = pop()
             if buf is None:
-                time.sleep(0.001)
+                if wait_ready is not None:
+                    wait_ready(0.005)
+                else:
+                    time.sleep(0.001)
                 continue
+            if mono_ns() >= loop_end_ns:
+                buf.release()
+                break
 
-            md = buf.meta_data
-            frame_no = f"{md.device_frame_number:04}"
-            timestamp = md.device_timestamp_ns
-
-            # CSV logging
-            if csv_writer is not None and csv_buffer is not None:
-                csv_buffer.append([frame_no, timestamp])
-                if len(csv_buffer) >= 10 and csv_file is not None:
-                    try:
-                        csv_writer.writerows(csv_buffer)
-                        csv_buffer.clear()
-                        csv_file.flush()
-                        csv_flush_count += 1
-                        print(f"[{serial}] CSV flush #{csv_flush_count}")
-                    except Exception as e:
-                        log_warning(serial, "failed to flush CSV buffer", e)
-
-            arr = buf.numpy_wrap()
-            payload = arr.tobytes()
-            payload_size = len(payload)
-
-            if raw_mode:
-                # Raw mode with headers and file splitting
-                # Record the first frame's timestamp as recording_start_ns
-                if recording_start_ns is None:
-                    recording_start_ns = timestamp
-
-                # Check if we need to start a new file
-                if current_raw_file is None or (frames_per_file > 0 and frame_count > 0 and frame_count % frames_per_file == 0):
-                    # Close current file if open
-                    if current_raw_file is not None:
-                        try:
-                            current_raw_file.flush()
-                            current_raw_file.close()
-                        except Exception as e:
-                            log_warning(serial, "failed to close raw file", e)
-
-                    # Open new file
-                    current_file_start_frame = frame_count
-                    new_filename = make_raw_split_filename(output_dir, serial, current_file_start_frame)
-                    try:
-                        current_raw_file = open(new_filename, "wb")
-                        files_created.append(new_filename)
-                        print(f"[{serial}] New raw file: {new_filename}", file=sys.stderr)
-
-                        # Write FileHeader
-                        # Use current frame's timestamp as recording_start_ns for this file
-                        write_file_header(
-                            current_raw_file,
-                            serial,
-                            timestamp,
-                            width,
-                            height,
-                            PIXEL_FORMAT_BAYER_GR8,
-                        )
-                    except OSError as e:
-                        log_warning(serial, f"failed to open raw file {new_filename}", e)
-                        buf.release()
-                        break
-
-                # Write FrameHeader + Payload
-                try:
-                    write_frame_header(current_raw_file, payload_size, frame_count, timestamp)
-                    current_raw_file.write(payload)
-                    frame_count += 1
-                    if frame_count % 30 == 0:
-                        current_raw_file.flush()
-                except (OSError, ValueError) as e:
-                    log_warning(serial, "failed to write frame to raw file", e)
-                    buf.release()
-                    break
-            else:
-                # MP4 mode (ffmpeg)
-                try:
-                    output_stream.write(payload)
-                    frame_count += 1
-                    if frame_count % 30 == 0:
-                        output_stream.flush()
-                except (BrokenPipeError, ValueError) as e:
-                    log_warning(serial, "failed to write frame to ffmpeg stdin", e)
-                    buf.release()
-                    break
-
-            buf.release()
+            # The writer logs, writes and releases the buffer.
+            submit(buf)
 
     finally:
-        # Close raw file if open
-        if current_raw_file is not None:
-            try:
-                current_raw_file.flush()
-                current_raw_file.close()
-            except Exception:
-                pass
+        # Drain pending writes so every buffer is released before the
+        # stream is stopped, then close the raw file.
+        writer.close()
+        _resume_gc()
 
-    # Flush MP4 output stream
-    if not raw_mode and output_stream is not None:
-        try:
-            output_stream.flush()
-        except (BrokenPipeError, ValueError) as e:
-            log_warning(serial, "failed to flush ffmpeg stdin", e)
+    frame_count = writer.frames_written
 
     try:
         grabber.acquisition_stop()
@@ -569,8 +1366,8 @@ def record_raw_frames(
     except ic4.IC4Exception as e:
         log_warning(serial, "failed to stop stream", e)
 
-    if raw_mode and files_created:
-        print(f"[{serial}] Created {len(files_created)} raw file(s)", file=sys.stderr)
+    if raw_mode and writer.files_created:
+        print(f"[{serial}] Created {len(writer.files_created)} raw file(s)", file=sys.stderr)
 
     return frame_count
 
@@ -638,6 +1435,17 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_FRAMES_PER_FILE,
         help=f"Number of frames per raw file (default: {DEFAULT_FRAMES_PER_FILE})",
     )
+    parser.add_argument(
+        "--num-buffers",
+        type=int,
+        default=SINK_NUM_BUFFERS,
+        help=(
+            "Number of sink buffers per camera; frames are written straight "
+            "from these, so this is also the writer backlog limit.  Each buffer "
+            "is mlocked when first written, so RLIMIT_MEMLOCK must cover "
+            f"N x frame size per camera to keep them all resident (default: {SINK_NUM_BUFFERS})"
+        ),
+    )
     return parser.parse_args()
 
 def main() -> None:
@@ -645,7 +1453,7 @@ def main() -> None:
     threshold_ms = args.offset_threshold_ms
     raw_mode = args.raw_output
     frames_per_file = args.frames_per_file
-    session_timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    session_timestamp = time.strftime("%Y%m%d-%H%M%S", time.localtime())
     session_dir = os.path.join("captures", session_timestamp)
     WIDTH, HEIGHT = 1920, 1080
     FRAME_RATE = 50.0
@@ -657,6 +1465,11 @@ def main() -> None:
     _ptp_precheck()
     camera_contexts: Dict[str, Dict[str, object]] = {}
     threads: Dict[str, threading.Thread] = {}
+    gc_paused = False
+    monitor = _CaptureMonitor(camera_contexts)
+    # Workers report (serial, frame_count) through a queue; result_map is
+    # filled from it on this thread once the workers have been joined.
+    result_queue: queue.SimpleQueue = queue.SimpleQueue()
     result_map: Dict[str, int] = {}
     serial_order: List[str] = []
     ffmpeg_proc: Optional[subprocess.Popen[bytes]] = None
@@ -678,17 +1491,23 @@ def main() -> None:
         img_width: int,
         img_height: int,
         raw_frames_per_file: int,
-        results: Dict[str, int],
+        frame_ready: threading.Event,
+        cpu_pair: tuple[Optional[int], Optional[int]],
+        results: queue.SimpleQueue,
+        monitor: _CaptureMonitor,
     ) -> None:
+        # Keep this camera's capture and writer threads on a fixed pair of
+        # cores so the hand-off queue and file state stay cache-local.
+        capture_cpu, writer_cpu = cpu_pair
+        _pin_current_thread(serial, capture_cpu)
+        # The capture thread sleeps on frames_queued between frames, so a
+        # realtime priority only shortens its wake-up latency.
+        _raise_thread_priority(serial, CAPTURE_THREAD_PRIORITY)
         csv_file = None
-        csv_writer = None
-        csv_buffer = []
-        csv_flush_count = 0
         try:
             csv_path = os.path.join(session_dir, f"cam{serial}.csv")
             csv_file = open(csv_path, "w", newline="", encoding="utf-8")
-            csv_writer = csv.writer(csv_file)
-            csv_writer.writerow(["frame_number", "device_timestamp_ns"])
+            csv_file.write(CSV_HEADER)
         except Exception as exc:
             log_warning(serial, "failed to open CSV output", exc)
         try:
@@ -705,25 +1524,17 @@ def main() -> None:
                 width=img_width,
                 height=img_height,
                 frames_per_file=raw_frames_per_file,
-                csv_writer=csv_writer,
-                csv_buffer=csv_buffer,
+                frame_ready=frame_ready,
+                writer_cpu=writer_cpu,
                 csv_file=csv_file,
-                csv_flush_count=csv_flush_count,
+                monitor=monitor,
             )
         except Exception as exc:
             log_warning(serial, "record_raw_frames raised exception", exc)
             count = 0
         finally:
             if csv_file is not None:
-                if csv_writer is not None and csv_buffer:
-                    try:
-                        csv_writer.writerows(csv_buffer)
-                        csv_buffer.clear()
-                        csv_file.flush()
-                        csv_flush_count += 1
-                        print(f"[{serial}] CSV flush #{csv_flush_count}")
-                    except Exception as exc:
-                        log_warning(serial, "failed to flush CSV buffer on close", exc)
+                # The frame writer has written its remaining rows by now.
                 try:
                     csv_file.flush()
                 except Exception as exc:
@@ -732,32 +1543,26 @@ def main() -> None:
                     csv_file.close()
                 except Exception as exc:
                     log_warning(serial, "failed to close CSV output", exc)
-        results[serial] = count
+        results.put((serial, count))
         print(f"[{serial}] frames={count}", file=sys.stderr)
 
     try:
-        # Phase 1: Camera open and basic settings (no stream_setup yet)
-        for serial in SERIAL_NUMBERS:
-            try:
-                device_info = find_device_by_serial(serial)
-            except RuntimeError as exc:
-                log_warning(serial, "device not found", exc)
-                continue
-
-            grabber = ic4.Grabber()
-            try:
-                grabber.device_open(device_info)
-            except ic4.IC4Exception as e:
-                log_warning(serial, "failed to open device", e)
-                continue
-
-            _ensure_camera_ptp_enabled(grabber)
-            configure_camera_basic(serial, grabber, WIDTH, HEIGHT, FRAME_RATE)
-
-            camera_contexts[serial] = {
-                "grabber": grabber,
-                "device_info": device_info,
-            }
+        # Phase 1: Camera open and basic settings (no stream_setup yet).
+        # Devices are enumerated once; the cameras are then opened and
+        # configured in parallel since each step is blocking GenTL I/O.
+        devices = {getattr(dev, "serial", None): dev for dev in ic4.DeviceEnum.devices()}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(SERIAL_NUMBERS)) as pool:
+            opened = list(
+                pool.map(
+                    lambda serial: _open_camera(
+                        serial, devices.get(serial), WIDTH, HEIGHT, FRAME_RATE
+                    ),
+                    SERIAL_NUMBERS,
+                )
+            )
+        for serial, ctx in zip(SERIAL_NUMBERS, opened):
+            if ctx is not None:
+                camera_contexts[serial] = ctx
 
         if not camera_contexts:
             sys.stderr.write("No cameras initialized successfully; exiting.\n")
@@ -787,7 +1592,7 @@ def main() -> None:
         for serial in serial_order:
             ctx = camera_contexts[serial]
             grabber = ctx["grabber"]
-            sink, listener = allocate_queue_sink(grabber, WIDTH, HEIGHT)
+            sink, listener = allocate_queue_sink(grabber, WIDTH, HEIGHT, args.num_buffers)
             ctx["sink"] = sink
             ctx["listener"] = listener
 
@@ -803,6 +1608,7 @@ def main() -> None:
                 ffmpeg_proc = subprocess.Popen(
                     ffmpeg_cmd,
                     stdin=subprocess.PIPE,
+                    bufsize=0,
                 )
             except Exception as e:
                 log_warning(serial, "failed to launch ffmpeg", e)
@@ -818,6 +1624,8 @@ def main() -> None:
                 failed_serials.append(serial)
                 continue
 
+            pipe_bytes = _grow_pipe(serial, ffmpeg_proc.stdin.fileno(), WIDTH * HEIGHT)
+            print(f"[{serial}] ffmpeg stdin pipe: {pipe_bytes} bytes", file=sys.stderr)
             ctx["ffmpeg_proc"] = ffmpeg_proc
 
         # Remove failed cameras from context
@@ -846,15 +1654,34 @@ def main() -> None:
             sys.stderr.write(
                 f"[RAW] Warning: estimated size ≈ {per_cam_gib:.2f} GiB per camera, total ≈ {total_gib:.2f} GiB\n"
             )
-        ts = host_target_ns / 1_000_000_000
-        dt = datetime.fromtimestamp(ts, tz=timezone.utc).astimezone()
-        formatted = dt.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        start_s, start_sub_ns = divmod(host_target_ns, 1_000_000_000)
+        formatted = (
+            f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(start_s))}"
+            f".{start_sub_ns // 1_000_000:03d}"
+        )
         print(
             f"[SCHEDULE] Recording will start at (PC clock): {formatted}",
             file=sys.stderr,
         )
         # Phase 5: Start capture threads for each camera
-        for serial, ctx in camera_contexts.items():
+        # Hold cyclic GC off from before the first thread starts until all
+        # of them have been joined, so no collection lands in the capture
+        # window while threads are still being spawned or draining.
+        _pause_gc()
+        gc_paused = True
+        # Threads rather than processes: the grabbers, sinks and ffmpeg pipes
+        # were opened and PTP-scheduled in this process, and the per-frame
+        # work (sink wait/pop, writev) runs with the GIL released.
+        cpus = _available_cpus()
+        for cam_index, (serial, ctx) in enumerate(camera_contexts.items()):
+            if cpus:
+                # Capture threads take the first CPUs, each on its own
+                # physical core; writers take the ones after them (further
+                # cores, or SMT siblings once the cores run out).
+                cam_count = len(camera_contexts)
+                cpu_pair = (cpus[cam_index % len(cpus)], cpus[(cam_index + cam_count) % len(cpus)])
+            else:
+                cpu_pair = (None, None)
             grabber = ctx["grabber"]  # type: ignore[assignment]
             sink = ctx["sink"]  # type: ignore[assignment]
             ffmpeg_proc = ctx.get("ffmpeg_proc")  # type: ignore[assignment]
@@ -879,12 +1706,16 @@ def main() -> None:
                     WIDTH,
                     HEIGHT,
                     frames_per_file,
-                    result_map,
+                    ctx["listener"].frame_ready,  # type: ignore[union-attr]
+                    cpu_pair,
+                    result_queue,
+                    monitor,
                 ),
                 name=f"CaptureThread-{serial}",
             )
             threads[serial] = thread
             thread.start()
+        monitor.start()
 
         # Wait for all threads to finish.
         for serial, thread in threads.items():
@@ -899,59 +1730,56 @@ def main() -> None:
                 except Exception as e:
                     log_warning(serial, "thread join failed during cleanup", e)
 
-        # Clean up resources.
-        for serial, ctx in list(camera_contexts.items()):
-            ffmpeg_proc = ctx.get("ffmpeg_proc")  # type: ignore[assignment]
-            if isinstance(ffmpeg_proc, subprocess.Popen):
-                try:
-                    if ffmpeg_proc.stdin and not ffmpeg_proc.stdin.closed:
-                        ffmpeg_proc.stdin.close()
-                except Exception as e:
-                    log_warning(serial, "failed to close ffmpeg stdin during cleanup", e)
-                try:
-                    ffmpeg_proc.wait()
-                except Exception as e:
-                    log_warning(serial, "ffmpeg wait failed during cleanup", e)
-            ctx.pop("ffmpeg_proc", None)
+        while True:
+            try:
+                serial, frame_total = result_queue.get_nowait()
+            except queue.Empty:
+                break
+            result_map[serial] = frame_total
 
-            grabber = ctx.pop("grabber", None)
-            if isinstance(grabber, ic4.Grabber):
-                try:
-                    grabber.acquisition_stop()
-                except ic4.IC4Exception as e:
-                    log_warning(serial, "failed to stop acquisition during cleanup", e)
-                try:
-                    grabber.stream_stop()
-                except ic4.IC4Exception as e:
-                    log_warning(serial, "failed to stop stream during cleanup", e)
-                try:
-                    if grabber.is_device_open:
-                        grabber.device_close()
-                except ic4.IC4Exception as e:
-                    log_warning(serial, "failed to close grabber device", e)
+        # Final sample while the grabbers are still open.
+        monitor.stop()
+
+        if gc_paused:
+            _resume_gc()
 
-            ctx.pop("sink", None)
-            ctx.pop("listener", None)
-            ctx.pop("device_info", None)
+        # Clean up resources.  ffmpeg's EOF flush and the GenTL stop/close
+        # calls block outside the GIL, so the cameras are shut down in
+        # parallel and teardown takes as long as the slowest one.
+        if camera_contexts:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(camera_contexts)) as pool:
+                list(pool.map(lambda item: _shutdown_camera(*item), list(camera_contexts.items())))
 
         if serial_order:
-            for serial in serial_order:
-                count = result_map.get(serial, 0)
+            expected = EXPECTED_FRAMES
+            threshold = max(2, int(0.001 * expected))
+            # Compute every camera's figures in one pass, then only format.
+            got = np.fromiter(
+                (result_map.get(serial, 0) for serial in serial_order),
+                dtype=np.int64,
+                count=len(serial_order),
+            )
+            delta = got - expected
+            if CAPTURE_DURATION > 0:
+                actual_fps = got / CAPTURE_DURATION
+            else:
+                actual_fps = np.zeros(len(got))
+            drift_ms = (delta / TRIGGER_INTERVAL_FPS) * 1000.0
+            too_large = np.abs(delta) > threshold
+            rows = list(
+                zip(serial_order, got.tolist(), delta.tolist(), actual_fps.tolist(), drift_ms.tolist(), too_large.tolist())
+            )
+            for serial, count, _, _, _, _ in rows:
                 print(f"[REPORT] serial={serial} frames={count}", file=sys.stderr)
-            for serial in serial_order:
-                expected = EXPECTED_FRAMES
-                got = result_map.get(serial, 0)
-                delta = got - expected
-                actual_fps = got / CAPTURE_DURATION if CAPTURE_DURATION > 0 else 0.0
-                drift_ms = (delta / TRIGGER_INTERVAL_FPS) * 1000.0
+            for serial, count, frame_delta, fps, drift, warn in rows:
                 print(
-                    f"[REPORT] serial={serial} expected={expected} got={got} delta={delta:+d} "
-                    f"duration={CAPTURE_DURATION:.3f}s actual_fps={actual_fps:.3f} drift_ms={drift_ms:+.3f}",
+                    f"[REPORT] serial={serial} expected={expected} got={count} delta={frame_delta:+d} "
+                    f"duration={CAPTURE_DURATION:.3f}s actual_fps={fps:.3f} drift_ms={drift:+.3f}",
                     file=sys.stdout,
                 )
-                threshold = max(2, int(0.001 * expected))
-                if abs(delta) > threshold:
-                    print(f"[{serial}] Warning: frame delta too large: {delta}", file=sys.stderr)
+                if warn:
+                    print(f"[{serial}] Warning: frame delta too large: {frame_delta}", file=sys.stderr)
+            monitor.summary(serial_order)
 
         camera_contexts.clear()
         threads.clear()
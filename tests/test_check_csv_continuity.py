@@ -0,0 +1,240 @@
+"""Unit tests for the CSV reader and drop scan of tools/check_csv_continuity.py."""
+
+import csv
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+
+import check_csv_continuity as ccc
+from check_csv_continuity import CsvReadError, detect_drop_intervals, read_csv_rows
+
+FPS = 30.0
+EXPECTED_DT_MS = 1000.0 / FPS
+HEADER = "frame_number,device_timestamp_ns"
+
+
+def _timestamps(n, drops=(), start=1_000_000_000):
+    """n timestamps at 30 fps, with one frame missing after each index in drops."""
+    ts = []
+    t = start
+    for i in range(n):
+        ts.append(t)
+        t += 33_333_333
+        if i in drops:
+            t += 33_333_333
+    return ts
+
+
+def _write(tmp_path, lines, newline="\n", trailing=True, name="cam.csv"):
+    path = tmp_path / name
+    text = newline.join(lines) + (newline if trailing else "")
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def _capture_lines(ts):
+    return [HEADER] + [f"{i:04d},{t}" for i, t in enumerate(ts)]
+
+
+def _rows(path):
+    """Flatten read_csv_rows into [(line, frame, ts), ...]."""
+    rows = []
+    for lines, frames, ts in read_csv_rows(path):
+        rows.extend((int(lines[k]), str(frames[k]), int(ts[k])) for k in range(len(ts)))
+    return rows
+
+
+def _issues(path):
+    return detect_drop_intervals(read_csv_rows(path), EXPECTED_DT_MS, path)
+
+
+def _reference_issues(path):
+    """Drop report of the original csv.DictReader implementation."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [
+            (idx, row["frame_number"], int(row["device_timestamp_ns"]))
+            for idx, row in enumerate(csv.DictReader(f), start=2)
+        ]
+    issues = []
+    for (pl, pf, pt), (cl, cf, ct) in zip(rows, rows[1:]):
+        dt = (ct - pt) / 1e6
+        if not EXPECTED_DT_MS - ccc.TOLERANCE_MS <= dt <= EXPECTED_DT_MS + ccc.TOLERANCE_MS:
+            issues.append((pl, cl, pf, cf, pt, ct))
+    return issues
+
+
+def _issue_keys(issues):
+    return [
+        (i["prev_line"], i["cur_line"], i["prev_frame"], i["cur_frame"], i["prev_ts"], i["cur_ts"])
+        for i in issues
+    ]
+
+
+class TestLineEndings:
+    """LF, CRLF and a missing final newline parse to the same rows."""
+
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    @pytest.mark.parametrize("trailing", [True, False])
+    def test_same_rows(self, tmp_path, newline, trailing):
+        ts = _timestamps(10, drops={4})
+        path = _write(tmp_path, _capture_lines(ts), newline, trailing)
+        assert _rows(path) == [(i + 2, f"{i:04d}", t) for i, t in enumerate(ts)]
+        assert _issue_keys(_issues(path)) == _reference_issues(path)
+        assert len(_issues(path)) == 1
+
+    def test_header_only(self, tmp_path):
+        path = _write(tmp_path, [HEADER])
+        assert _rows(path) == []
+        assert _issues(path) == []
+
+    def test_empty_file(self, tmp_path):
+        path = _write(tmp_path, [], trailing=False)
+        with pytest.raises(CsvReadError, match="missing header"):
+            list(read_csv_rows(path))
+
+
+class TestIrregularRows:
+    """Rows the vectorized parser hands to np.loadtxt or the exact parser."""
+
+    def test_blank_lines_are_not_counted(self, tmp_path):
+        ts = _timestamps(6, drops={2})
+        lines = _capture_lines(ts)
+        lines.insert(3, "")
+        lines.insert(6, "")
+        path = _write(tmp_path, lines, "\r\n")
+        assert _rows(path) == [(i + 2, f"{i:04d}", t) for i, t in enumerate(ts)]
+        assert _issue_keys(_issues(path)) == _reference_issues(path)
+
+    def test_quoted_fields(self, tmp_path):
+        ts = _timestamps(6, drops={3})
+        lines = [HEADER] + [f'"{i:04d}","{t}"' for i, t in enumerate(ts)]
+        path = _write(tmp_path, lines, "\r\n")
+        assert _rows(path) == [(i + 2, f"{i:04d}", t) for i, t in enumerate(ts)]
+        assert _issue_keys(_issues(path)) == _reference_issues(path)
+
+    def test_extra_column_is_ignored(self, tmp_path):
+        ts = _timestamps(6, drops={1})
+        lines = _capture_lines(ts)
+        lines[3] += ",extra"
+        path = _write(tmp_path, lines)
+        assert [t for _, _, t in _rows(path)] == ts
+        assert _issue_keys(_issues(path)) == _reference_issues(path)
+
+    def test_short_row(self, tmp_path):
+        lines = _capture_lines(_timestamps(5))
+        lines[4] = "0003"
+        path = _write(tmp_path, lines)
+        with pytest.raises(CsvReadError, match="missing required columns at line 5"):
+            list(read_csv_rows(path))
+
+    def test_other_header_layout(self, tmp_path):
+        """A reordered header with extra columns takes the np.loadtxt path."""
+        ts = _timestamps(8, drops={5})
+        lines = ["device_timestamp_ns,exposure,frame_number"]
+        lines += [f"{t},100,{i:04d}" for i, t in enumerate(ts)]
+        path = _write(tmp_path, lines)
+        assert _rows(path) == [(i + 2, f"{i:04d}", t) for i, t in enumerate(ts)]
+        assert _issue_keys(_issues(path)) == _reference_issues(path)
+
+    def test_missing_column_in_header(self, tmp_path):
+        path = _write(tmp_path, ["frame_number,ts", "0,1"])
+        with pytest.raises(CsvReadError, match="missing required columns in header"):
+            list(read_csv_rows(path))
+
+
+class TestTimestamps:
+    """Malformed and out-of-range device timestamps."""
+
+    @pytest.mark.parametrize("bad", ["abc", "12.5", "", "1e9"])
+    def test_bad_timestamp(self, tmp_path, bad):
+        lines = _capture_lines(_timestamps(5))
+        lines[3] = f"0002,{bad}"
+        path = _write(tmp_path, lines)
+        with pytest.raises(CsvReadError, match="parse error at line 4"):
+            list(read_csv_rows(path))
+
+    def test_bad_frame_number_in_report(self, tmp_path):
+        ts = _timestamps(5, drops={1})
+        lines = _capture_lines(ts)
+        lines[3] = f"x2,{ts[2]}"
+        path = _write(tmp_path, lines)
+        with pytest.raises(CsvReadError, match="parse error at line 4"):
+            _issues(path)
+
+    @pytest.mark.parametrize(
+        "value",
+        ["99999999999999999999", "9223372036854775808", "-99999999999999999999"],
+    )
+    def test_out_of_int64_range_is_a_drop(self, tmp_path, value):
+        lines = _capture_lines(_timestamps(6))
+        lines[4] = f"0010,{value}"
+        path = _write(tmp_path, lines)
+        issues = _issues(path)
+        assert _issue_keys(issues) == _reference_issues(path)
+        assert [(i["prev_line"], i["cur_line"]) for i in issues] == [(4, 5), (5, 6)]
+        assert issues[0]["cur_ts"] == int(value)
+
+    def test_int64_max_uses_vectorized_parser(self):
+        buf = b"0001,9223372036854775807\n0002,9223372036854775808\n"
+        assert ccc._parse_capture_window(buf) is None
+        frames, ts = ccc._parse_capture_window(buf[:25])
+        assert frames[0] == "0001"
+        assert int(ts[0]) == 9223372036854775807
+
+
+class TestWindows:
+    """Drops are found across CSV_WINDOW_BYTES window boundaries."""
+
+    @pytest.mark.parametrize("window", [16, 23, 24, 25, 40, 64, 97])
+    @pytest.mark.parametrize("newline", ["\n", "\r\n"])
+    def test_boundary_drops(self, tmp_path, monkeypatch, window, newline):
+        ts = _timestamps(60, drops=set(range(0, 60, 3)))
+        path = _write(tmp_path, _capture_lines(ts), newline)
+        expected = _issue_keys(_issues(path))
+        assert expected == _reference_issues(path)
+
+        monkeypatch.setattr(ccc, "CSV_WINDOW_BYTES", window)
+        assert len(list(read_csv_rows(path))) > 1
+        assert _rows(path) == [(i + 2, f"{i:04d}", t) for i, t in enumerate(ts)]
+        assert _issue_keys(_issues(path)) == expected
+
+    def test_boundary_with_fallback_window(self, tmp_path, monkeypatch):
+        """One window needs the exact parser; line numbers stay continuous."""
+        ts = _timestamps(30, drops={9, 10, 20})
+        lines = _capture_lines(ts)
+        lines[12] = f"0010,{10**20}"
+        lines[20] = ""
+        path = _write(tmp_path, lines)
+        monkeypatch.setattr(ccc, "CSV_WINDOW_BYTES", 48)
+        assert _issue_keys(_issues(path)) == _reference_issues(path)
+
+    @pytest.mark.parametrize("value", [2**63 + 5, -(2**63) - 5, 10**20 + 1])
+    def test_out_of_range_row_ends_window(self, tmp_path, monkeypatch, value):
+        """The carried out-of-range row keeps its exact value in the next window.
+
+        Device timestamps are epoch nanoseconds, beyond float64's exact
+        integer range, so any float promotion would show in the report.
+        """
+        ts = _timestamps(12, drops={8}, start=1_700_000_000_123_456_789)
+        lines = _capture_lines(ts)
+        lines[6] = f"0005,{value}"
+        path = _write(tmp_path, lines)
+        data = Path(path).read_bytes()
+        body = data.index(b"\n") + 1
+        cut = data.index(b"\n", data.index(str(value).encode())) + 1
+        monkeypatch.setattr(ccc, "CSV_WINDOW_BYTES", cut - body)
+
+        chunks = list(read_csv_rows(path))
+        assert chunks[0][2].dtype == object and int(chunks[0][2][-1]) == value
+        assert chunks[1][2].dtype == np.int64
+
+        issues = _issues(path)
+        assert _issue_keys(issues) == _reference_issues(path)
+        assert [(i["prev_line"], i["cur_line"]) for i in issues] == [(6, 7), (7, 8), (10, 11)]
+        assert issues[1]["prev_ts"] == value
+        assert issues[1]["cur_ts"] == ts[6]
+        assert issues[1]["dt_ms"] == (ts[6] - value) / 1e6
@@ -0,0 +1,168 @@
+"""Unit tests for the frame scanners and encode copy path of tools/raw_tool.py."""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+
+import raw_tool
+from raw_tool import (
+    FILE_HEADER_STRUCT,
+    FRAM_MAGIC,
+    FRAME_HEADER_STRUCT,
+    SRAW_MAGIC,
+    iter_frame_infos,
+    iter_frame_infos_mmap,
+    map_raw_file,
+    read_file_header,
+    scan_frame_columns,
+    scan_frame_locations,
+)
+
+
+def _write_raw(tmp_path, frames, tail=b"", name="cam1_000000.raw"):
+    """Write an SRAW file; frames are (payload_size, magic) pairs."""
+    path = tmp_path / name
+    parts = [FILE_HEADER_STRUCT.pack(SRAW_MAGIC, 1, b"1", 0, 4, 2, 0, 0)]
+    for i, (size, magic) in enumerate(frames):
+        parts.append(FRAME_HEADER_STRUCT.pack(magic, size, i, 1_000 + 33 * i))
+        parts.append(bytes([i % 251]) * size)
+    parts.append(tail)
+    path.write_bytes(b"".join(parts))
+    return str(path)
+
+
+def _reference(path):
+    with open(path, "rb") as f:
+        read_file_header(f)
+        return list(iter_frame_infos(f))
+
+
+def _from_mmap(path):
+    with open(path, "rb") as f, map_raw_file(f) as mm:
+        return list(iter_frame_infos_mmap(mm))
+
+
+def _from_columns(path):
+    """scan_frame_columns as (infos without magic, bad-magic indices)."""
+    with open(path, "rb") as f, map_raw_file(f) as mm:
+        cols = scan_frame_columns(mm)
+    rows = list(zip(cols.frame_index, cols.timestamp_ns, cols.payload_size, cols.file_offset))
+    return rows, list(cols.bad_magic)
+
+
+def _assert_scanners_agree(path):
+    expected = _reference(path)
+    assert _from_mmap(path) == expected
+    rows, bad_magic = _from_columns(path)
+    assert rows == [(i.frame_index, i.timestamp_ns, i.payload_size, i.file_offset) for i in expected]
+    assert bad_magic == [k for k, i in enumerate(expected) if i.magic != FRAM_MAGIC]
+    return expected
+
+
+def _uniform(n, size=8):
+    return [(size, FRAM_MAGIC)] * n
+
+
+class TestScannersAgree:
+    """iter_frame_infos_mmap and scan_frame_columns match iter_frame_infos."""
+
+    def test_uniform(self, tmp_path):
+        infos = _assert_scanners_agree(_write_raw(tmp_path, _uniform(20)))
+        assert len(infos) == 20
+
+    def test_header_only(self, tmp_path):
+        assert _assert_scanners_agree(_write_raw(tmp_path, [])) == []
+
+    def test_zero_payload(self, tmp_path):
+        infos = _assert_scanners_agree(_write_raw(tmp_path, _uniform(5, size=0)))
+        assert len(infos) == 5
+
+    @pytest.mark.parametrize("change_at", [0, 1, 7, 19])
+    def test_payload_size_change(self, tmp_path, change_at):
+        frames = _uniform(change_at, 8) + _uniform(20 - change_at, 12)
+        infos = _assert_scanners_agree(_write_raw(tmp_path, frames))
+        assert [i.payload_size for i in infos] == [f[0] for f in frames]
+
+    def test_mixed_sizes(self, tmp_path):
+        sizes = [8, 8, 8, 3, 8, 8, 0, 0, 16, 8, 8]
+        _assert_scanners_agree(_write_raw(tmp_path, [(s, FRAM_MAGIC) for s in sizes]))
+
+    def test_bad_magic(self, tmp_path):
+        frames = _uniform(10)
+        frames[0] = (8, b"XXXX")
+        frames[6] = (8, b"FRAN")
+        infos = _assert_scanners_agree(_write_raw(tmp_path, frames))
+        assert [i.magic for i in infos].count(FRAM_MAGIC) == 8
+
+    @pytest.mark.parametrize("tail_bytes", [1, 23, 24, 25, 31])
+    def test_truncated_tail(self, tmp_path, tail_bytes):
+        """A partial header is dropped; a header with a short payload is kept."""
+        header = FRAME_HEADER_STRUCT.pack(FRAM_MAGIC, 8, 10, 9_999)
+        tail = (header + b"\xff" * 8)[:tail_bytes]
+        infos = _assert_scanners_agree(_write_raw(tmp_path, _uniform(10), tail))
+        assert len(infos) == (11 if tail_bytes >= FRAME_HEADER_STRUCT.size else 10)
+
+    def test_truncated_after_size_change(self, tmp_path):
+        frames = _uniform(6, 8) + _uniform(3, 5)
+        tail = FRAME_HEADER_STRUCT.pack(FRAM_MAGIC, 5, 9, 0) + b"\x00\x00"
+        _assert_scanners_agree(_write_raw(tmp_path, frames, tail))
+
+
+class TestScanBatches:
+    """scan_frame_columns gives the same columns whatever SCAN_BATCH_FRAMES is."""
+
+    @pytest.mark.parametrize("batch", [1, 2, 3, 4, 5, 16])
+    @pytest.mark.parametrize("change_at", [None, 3, 4, 8, 12])
+    def test_batch_boundaries(self, tmp_path, monkeypatch, batch, change_at):
+        n = 16
+        frames = _uniform(n)
+        if change_at is not None:
+            frames[change_at:] = _uniform(n - change_at, 4)
+        frames[5] = (frames[5][0], b"BAD!")
+        tail = FRAME_HEADER_STRUCT.pack(FRAM_MAGIC, 8, n, 0)
+        path = _write_raw(tmp_path, frames, tail)
+        monkeypatch.setattr(raw_tool, "SCAN_BATCH_FRAMES", batch)
+        infos = _assert_scanners_agree(path)
+        assert len(infos) == n + 1
+
+
+class TestCopyFrames:
+    """_copy_frames, the encode path used when sendfile() is unavailable."""
+
+    def _locations(self, tmp_path, sizes):
+        path = _write_raw(tmp_path, [(size, FRAM_MAGIC) for size in sizes])
+        return scan_frame_locations([path])[1]
+
+    def test_payloads_and_duplicates(self, tmp_path):
+        locations = self._locations(tmp_path, [8, 8, 12, 4, 8, 16, 8])
+        plan = [0, 0, 1, 2, 2, 2, 3, 4, 5, 5, 6]
+        out = io.BytesIO()
+        duplicated = raw_tool._copy_frames(raw_tool._plan_runs(plan), locations, out)
+        assert duplicated == 4
+        assert out.getvalue() == b"".join(bytes([i]) * locations[i].payload_size for i in plan)
+
+    def test_empty_plan(self, tmp_path):
+        locations = self._locations(tmp_path, [8])
+        out = io.BytesIO()
+        assert raw_tool._copy_frames([], locations, out) == 0
+        assert out.getvalue() == b""
+
+    @pytest.mark.parametrize("exc_type", [OSError, RuntimeError, MemoryError])
+    def test_reader_error_is_raised(self, tmp_path, monkeypatch, exc_type):
+        locations = self._locations(tmp_path, [8] * 10)
+        calls = []
+
+        def failing_read(fd, loc, buf):
+            calls.append(loc)
+            if len(calls) == 3:
+                raise exc_type("read failed")
+            return memoryview(buf)[:loc.payload_size]
+
+        monkeypatch.setattr(raw_tool, "_read_payload_into", failing_read)
+        out = io.BytesIO()
+        with pytest.raises(exc_type, match="read failed"):
+            raw_tool._copy_frames(raw_tool._plan_runs(list(range(10))), locations, out)
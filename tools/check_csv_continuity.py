@@ -4,74 +4,298 @@
 #   python3 check_csv_continuity.py -f 30 --files cam1.csv cam2.csv cam3.csv cam4.csv
 
 import argparse
+import concurrent.futures
 import csv
+import io
+import math
+import mmap
 import os
 import sys
+import warnings
+
+import numpy as np
 
 
 DEFAULT_FILES = ["cam1.csv", "cam2.csv", "cam3.csv", "cam4.csv"]
 TOLERANCE_MS = 0.1
 
+# Columns loaded from each CSV: frame_number is kept as text, the timestamp
+# is parsed to int64.
+CSV_DTYPE = np.dtype([("frame_number", "U32"), ("device_timestamp_ns", np.int64)])
+# Bytes of CSV body parsed per window; bounds peak memory regardless of
+# capture length.
+CSV_WINDOW_BYTES = 4 * 1024 * 1024
+# Header written by the capture tools.  Files with exactly this layout take
+# the vectorized timestamp parser; anything else goes through np.loadtxt.
+CAPTURE_HEADER = ["frame_number", "device_timestamp_ns"]
+# Longest decimal that fits in int64 (9223372036854775807).
+MAX_TS_DIGITS = 19
+INT64_MIN = int(np.iinfo(np.int64).min)
+INT64_MAX = int(np.iinfo(np.int64).max)
+
 
 class CsvReadError(Exception):
     pass
 
 
+def _required_column_indices(header, path):
+    """Return the (frame_number, device_timestamp_ns) column indices."""
+    if header is None:
+        raise CsvReadError(f"missing header: {path}")
+    try:
+        return header.index("frame_number"), header.index("device_timestamp_ns")
+    except ValueError:
+        raise CsvReadError(f"missing required columns in header: {path}")
+
+
+def _parse_window_exact(text, usecols, path, first_line):
+    """Parse a window row by row with int(), as the csv.DictReader loop used to.
+
+    Only used after np.loadtxt has rejected the window.  A malformed row is
+    reported with its line number; a timestamp that int() accepts but that
+    does not fit int64 (a corrupted counter, say) is kept as a Python int,
+    so the interval around it is reported as a drop instead of stopping the
+    check.
+    """
+    fi, ti = usecols
+    needed = max(fi, ti) + 1
+    frames = []
+    stamps = []
+    reader = csv.reader(io.StringIO(text, newline=""))
+    # Blank rows are skipped without being counted, as the bulk parser does.
+    for row_idx, row in enumerate(filter(None, reader), start=first_line):
+        if len(row) < needed:
+            raise CsvReadError(f"missing required columns at line {row_idx} in {path}")
+        try:
+            stamps.append(int(row[ti]))
+        except Exception as exc:
+            raise CsvReadError(f"parse error at line {row_idx} in {path}: {exc}")
+        frames.append(row[fi])
+    try:
+        ts = np.array(stamps, dtype=np.int64)
+    except OverflowError:
+        ts = np.array(stamps, dtype=object)
+    return frames, ts
+
+
+class _FrameColumn:
+    """frame_number text of one window, decoded only when indexed.
+
+    Only the rows that end up in a report are ever looked at, so the column
+    keeps byte offsets into the window instead of a string per row.
+    """
+
+    def __init__(self, buf, starts, stops):
+        self._buf = buf
+        self._starts = starts
+        self._stops = stops
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, i):
+        return self._buf[self._starts[i]:self._stops[i]].decode("utf-8")
+
+
+def _parse_capture_window(buf):
+    """Parse complete `frame_number,device_timestamp_ns` lines without a CSV parser.
+
+    Newlines and commas are located with a vectorized byte scan and the
+    timestamp digits are gathered into a matrix and accumulated column by
+    column.  Returns (frames, timestamps), or None when the window is not in
+    that plain form (quotes, blank or ragged lines, signs, spaces, ...), in
+    which case the caller falls back to np.loadtxt.
+    """
+    b = np.frombuffer(buf, dtype=np.uint8)
+    if b.size == 0 or (b == 0x22).any():
+        return None
+
+    ends = np.flatnonzero(b == 0x0A)
+    if b[-1] != 0x0A:
+        ends = np.append(ends, b.size)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    ends = ends - (b[ends - 1] == 0x0D)
+
+    # Exactly one comma per line, inside that line.
+    commas = np.flatnonzero(b == 0x2C)
+    if commas.size != ends.size or not ((commas >= starts) & (commas < ends)).all():
+        return None
+
+    ts_starts = commas + 1
+    widths = ends - ts_starts
+    if widths.min() < 1 or widths.max() > MAX_TS_DIGITS:
+        return None
+
+    cols = np.arange(widths.max())
+    in_field = cols < widths[:, None]
+    digits = b[np.where(in_field, ts_starts[:, None] + cols, 0)] - np.uint8(0x30)
+    if (digits[in_field] > 9).any():
+        return None
+
+    ts = np.zeros(ends.size, dtype=np.uint64)
+    for col in cols:
+        ts = np.where(in_field[:, col], ts * np.uint64(10) + digits[:, col], ts)
+    if ts.max() > INT64_MAX:
+        return None
+    return _FrameColumn(buf, starts, commas), ts.astype(np.int64)
+
+
+def _load_window(buf, usecols, path, first_line):
+    """Parse a window with np.loadtxt; returns (frames, timestamps).
+
+    Windows loadtxt rejects are re-parsed by _parse_window_exact, which
+    either reports the bad line or returns the rows.
+    """
+    text = buf.decode("utf-8")
+    try:
+        with warnings.catch_warnings():
+            # Blank-only windows are valid; they just have no rows.
+            warnings.simplefilter("ignore", UserWarning)
+            data = np.loadtxt(
+                io.StringIO(text, newline=""),
+                delimiter=",",
+                usecols=usecols,
+                dtype=CSV_DTYPE,
+                comments=None,
+                quotechar='"',
+                ndmin=1,
+            )
+    except ValueError:
+        return _parse_window_exact(text, usecols, path, first_line)
+    return data["frame_number"], data["device_timestamp_ns"]
+
+
 def read_csv_rows(path):
+    """Yield the rows of a camera CSV as (lines, frames, timestamps) chunks.
+
+    The file is memory-mapped and parsed in windows of about
+    CSV_WINDOW_BYTES that end on a line boundary, so only one window is in
+    memory at a time.
+    """
     if not os.path.exists(path):
         raise CsvReadError(f"file not found: {path}")
 
-    rows = []
-    with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        if reader.fieldnames is None:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
             raise CsvReadError(f"missing header: {path}")
-        if "frame_number" not in reader.fieldnames or "device_timestamp_ns" not in reader.fieldnames:
-            raise CsvReadError(f"missing required columns in header: {path}")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            body = mm.find(b"\n") + 1 or size
+
+            # Only the header goes through the csv module; the column
+            # indices are looked up once and the body is parsed in bulk.
+            header_text = mm[:body].decode("utf-8")
+            header = next(csv.reader(io.StringIO(header_text, newline="")), None)
+            usecols = _required_column_indices(header, path)
+            fast = header == CAPTURE_HEADER
+
+            next_line = 2
+            pos = body
+            while pos < size:
+                end = min(pos + CSV_WINDOW_BYTES, size)
+                if end < size:
+                    cut = mm.rfind(b"\n", pos, end)
+                    if cut < 0:
+                        cut = mm.find(b"\n", end)
+                    end = size if cut < 0 else cut + 1
+                # Slicing copies the window, so no buffer into the map
+                # outlives it.
+                buf = mm[pos:end]
+                pos = end
+
+                parsed = _parse_capture_window(buf) if fast else None
+                if parsed is None:
+                    parsed = _load_window(buf, usecols, path, next_line)
+                frames, ts = parsed
 
-        for row_idx, row in enumerate(reader, start=2):
-            frame_raw = row.get("frame_number")
-            ts_raw = row.get("device_timestamp_ns")
-            if frame_raw is None or ts_raw is None:
-                raise CsvReadError(f"missing required columns at line {row_idx} in {path}")
-            try:
-                int(frame_raw)
-                ts = int(ts_raw)
-            except Exception as exc:
-                raise CsvReadError(f"parse error at line {row_idx} in {path}: {exc}")
+                # Parallel columns: line numbers, frame_number text, timestamps.
+                lines = np.arange(next_line, next_line + ts.size, dtype=np.int64)
+                next_line += ts.size
+                yield lines, frames, ts
 
-            rows.append((row_idx, frame_raw, ts))
 
-    return rows
+def _checked_frame(frame, line, path):
+    """Return frame as text after checking that it is an integer.
 
+    frame_number is only ever echoed back, so it is validated lazily for
+    the rows that end up in a report rather than for every row.
+    """
+    frame = str(frame)
+    try:
+        int(frame)
+    except ValueError as exc:
+        raise CsvReadError(f"parse error at line {line} in {path}: {exc}")
+    return frame
 
-def detect_drop_intervals(rows, expected_dt_ms):
+
+def detect_drop_intervals(chunks, expected_dt_ms, path="<csv>"):
     issues = []
-    lower = expected_dt_ms - TOLERANCE_MS
-    upper = expected_dt_ms + TOLERANCE_MS
-
-    for i in range(1, len(rows)):
-        prev_line, prev_frame, prev_ts = rows[i - 1]
-        cur_line, cur_frame, cur_ts = rows[i]
-        dt_ms = (cur_ts - prev_ts) / 1e6
-        if dt_ms < lower or dt_ms > upper:
-            diff = dt_ms - expected_dt_ms
+    # The tolerance window in whole nanoseconds, so the scan compares the
+    # int64 timestamp deltas directly: dt < lower_ns exactly when
+    # dt < (expected - tol) * 1e6, and likewise for the upper bound.
+    lower_ns = math.ceil((expected_dt_ms - TOLERANCE_MS) * 1e6)
+    upper_ns = math.floor((expected_dt_ms + TOLERANCE_MS) * 1e6)
+
+    prev = None  # (line, frame, ts) of the last row of the previous chunk
+    for lines, frames, ts in chunks:
+        if ts.size == 0:
+            continue
+        # Prepend the last timestamp of the previous chunk so the interval
+        # across the chunk boundary is checked too; index -1 below refers
+        # to that carried row.
+        # A timestamp outside int64 is only ever held in an object array;
+        # mixing it into an int64 one would silently promote to float64.
+        offset = 0
+        if prev is not None:
+            carried = prev[2]
+            if ts.dtype == object or not INT64_MIN <= carried <= INT64_MAX:
+                ts = np.concatenate((np.array([carried], dtype=object), ts.astype(object)))
+            else:
+                ts = np.concatenate((np.array([carried], dtype=np.int64), ts))
+            offset = 1
+
+        def row(k):
+            if k < 0:
+                return prev
+            return int(lines[k]), frames[k], int(ts[k + offset])
+
+        # Scan the chunk's intervals in one vectorized integer pass; only the
+        # (few) abnormal intervals are converted to ms and Python objects.
+        dt_ns = np.diff(ts)
+        for i in np.flatnonzero((dt_ns < lower_ns) | (dt_ns > upper_ns)):
+            prev_line, prev_frame, prev_ts = row(i - offset)
+            cur_line, cur_frame, cur_ts = row(i - offset + 1)
+            dt = float(dt_ns[i]) / 1e6
             issues.append(
                 {
                     "prev_line": prev_line,
                     "cur_line": cur_line,
-                    "prev_frame": prev_frame,
-                    "cur_frame": cur_frame,
+                    "prev_frame": _checked_frame(prev_frame, prev_line, path),
+                    "cur_frame": _checked_frame(cur_frame, cur_line, path),
                     "prev_ts": prev_ts,
                     "cur_ts": cur_ts,
-                    "dt_ms": dt_ms,
-                    "diff_ms": diff,
+                    "dt_ms": dt,
+                    "diff_ms": dt - expected_dt_ms,
                 }
             )
+        prev = row(lines.size - 1)
 
     return issues
 
 
+def check_file(path, expected_dt_ms):
+    """Scan one CSV and return (issues, error message or None).
+
+    Runs in a worker process, so errors are returned rather than raised.
+    """
+    try:
+        return detect_drop_intervals(read_csv_rows(path), expected_dt_ms, path), None
+    except CsvReadError as exc:
+        return None, str(exc)
+
+
 def format_issue(issue):
     return (
         f"  - lines {issue['prev_line']}->{issue['cur_line']} "
@@ -105,30 +329,44 @@ def main():
     expected_dt_ms = 1000.0 / args.fps
     had_drops = False
 
-    for path in args.files:
+    # The files are independent, so they are scanned in parallel; the report
+    # is still printed in argument order and stops at the first bad file.
+    if len(args.files) > 1:
+        workers = min(len(args.files), os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(check_file, args.files, [expected_dt_ms] * len(args.files)))
+    else:
+        results = [check_file(path, expected_dt_ms) for path in args.files]
+
+    # The whole report is assembled first and written with a single call,
+    # rather than one write per line on noisy captures.
+    out = []
+    status = 0
+    for path, (issues, error) in zip(args.files, results):
         name = os.path.basename(path)
-        try:
-            rows = read_csv_rows(path)
-        except CsvReadError as exc:
-            print(f"error: {exc}")
-            return 2
+        if error is not None:
+            out.append(f"error: {error}")
+            status = 2
+            break
 
-        print(f"{name}:")
-        print(f"  - fps={args.fps} expected_dt_ms={expected_dt_ms:.3f} (±{TOLERANCE_MS:.1f} ms)")
+        out.append(f"{name}:")
+        out.append(f"  - fps={args.fps} expected_dt_ms={expected_dt_ms:.3f} (±{TOLERANCE_MS:.1f} ms)")
 
-        issues = detect_drop_intervals(rows, expected_dt_ms)
         if issues:
             had_drops = True
-            print("  - drops:")
-            for issue in issues:
-                print(format_issue(issue))
-            print(f"  - total_drops={len(issues)}")
+            out.append("  - drops:")
+            out.extend(format_issue(issue) for issue in issues)
+            out.append(f"  - total_drops={len(issues)}")
         else:
-            print("  - フレーム落ちなし")
-            print("  - total_drops=0")
+            out.append("  - フレーム落ちなし")
+            out.append("  - total_drops=0")
 
-        print("")
+        out.append("")
 
+    if out:
+        sys.stdout.write("\n".join(out) + "\n")
+    if status:
+        return status
     return 1 if had_drops else 0
 
 
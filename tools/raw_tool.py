@@ -12,13 +12,24 @@ Usage:
 """
 
 import argparse
+import array
+import bisect
+import concurrent.futures
+import contextlib
 import csv
+import errno
 import glob
+import io
+import itertools
+import mmap
+import operator
 import os
+import queue
 import re
 import struct
 import subprocess
 import sys
+import threading
 from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 # ---------------------------------------------------------------------------
@@ -30,9 +41,11 @@ FRAM_MAGIC = b'FRAM'
 SRAW_VERSION = 1
 
 FILE_HEADER_FORMAT = '<4sI16sqHHHH'  # 40 bytes
-FILE_HEADER_SIZE = struct.calcsize(FILE_HEADER_FORMAT)  # 40
+FILE_HEADER_STRUCT = struct.Struct(FILE_HEADER_FORMAT)
+FILE_HEADER_SIZE = FILE_HEADER_STRUCT.size  # 40
 FRAME_HEADER_FORMAT = '<4sIQq'  # 24 bytes
-FRAME_HEADER_SIZE = struct.calcsize(FRAME_HEADER_FORMAT)  # 24
+FRAME_HEADER_STRUCT = struct.Struct(FRAME_HEADER_FORMAT)
+FRAME_HEADER_SIZE = FRAME_HEADER_STRUCT.size  # 24
 
 PIXEL_FORMAT_NAMES = {
     0: "BayerGR8",
@@ -79,6 +92,16 @@ class FrameInfo(NamedTuple):
     timestamp_ns: int
     payload_size: int
     file_offset: int
+    magic: bytes
+
+
+class FrameColumns(NamedTuple):
+    """Per-frame header fields of one raw file, one array per field."""
+    frame_index: array.array    # 'Q'
+    timestamp_ns: array.array   # 'q'
+    payload_size: array.array   # 'I'
+    file_offset: array.array    # 'q'
+    bad_magic: array.array      # 'q', positions of frames whose magic is not FRAM_MAGIC
 
 
 class SessionFiles(NamedTuple):
@@ -104,9 +127,7 @@ def read_file_header(f: BinaryIO) -> FileHeader:
     data = f.read(FILE_HEADER_SIZE)
     if len(data) < FILE_HEADER_SIZE:
         raise ValueError(f"File too small for FileHeader (got {len(data)} bytes, need {FILE_HEADER_SIZE})")
-    magic, version, serial_bytes, start_ns, w, h, pf, reserved = struct.unpack(
-        FILE_HEADER_FORMAT, data
-    )
+    magic, version, serial_bytes, start_ns, w, h, pf, reserved = FILE_HEADER_STRUCT.unpack(data)
     serial = serial_bytes.split(b'\x00')[0].decode('ascii', errors='replace')
     return FileHeader(magic, version, serial, start_ns, w, h, pf, reserved)
 
@@ -115,21 +136,135 @@ def read_frame_header(f: BinaryIO) -> Optional[FrameHeader]:
     data = f.read(FRAME_HEADER_SIZE)
     if len(data) < FRAME_HEADER_SIZE:
         return None
-    magic, payload_size, frame_index, timestamp_ns = struct.unpack(
-        FRAME_HEADER_FORMAT, data
-    )
+    magic, payload_size, frame_index, timestamp_ns = FRAME_HEADER_STRUCT.unpack(data)
     return FrameHeader(magic, payload_size, frame_index, timestamp_ns)
 
 
 def iter_frame_infos(f: BinaryIO) -> Iterator[FrameInfo]:
     """Iterate FrameInfos from current position (after FileHeader). Skips payloads."""
+    # Headers are read into one reused buffer and unpacked in place, so
+    # the scan allocates no per-frame bytes or FrameHeader objects.
+    buf = bytearray(FRAME_HEADER_SIZE)
+    unpack_from = FRAME_HEADER_STRUCT.unpack_from
     while True:
         offset = f.tell()
-        fh = read_frame_header(f)
-        if fh is None:
+        if f.readinto(buf) < FRAME_HEADER_SIZE:
             break
-        yield FrameInfo(fh.frame_index, fh.timestamp_ns, fh.payload_size, offset)
-        f.seek(fh.payload_size, os.SEEK_CUR)
+        magic, payload_size, frame_index, timestamp_ns = unpack_from(buf)
+        yield FrameInfo(frame_index, timestamp_ns, payload_size, offset, magic)
+        f.seek(payload_size, os.SEEK_CUR)
+
+
+@contextlib.contextmanager
+def map_raw_file(f: BinaryIO) -> Iterator[mmap.mmap]:
+    """Map an open raw file read-only for header scans.
+
+    Readahead is turned off: a scan touches only the page holding each
+    FrameHeader, and prefetching would pull in the payloads it skips.
+    """
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if hasattr(mmap, "MADV_RANDOM"):
+            mm.madvise(mmap.MADV_RANDOM)
+        yield mm
+    finally:
+        mm.close()
+
+
+def _prefetch_mapped_range(mm: mmap.mmap, start: int, length: int) -> None:
+    """Ask the kernel to read [start, start+length) of a scan mapping ahead.
+
+    map_raw_file turns readahead off, so a bulk copy out of the mapping
+    would otherwise fault its pages in one at a time.
+    """
+    if not hasattr(mmap, "MADV_WILLNEED"):
+        return
+    aligned = start - start % mmap.PAGESIZE
+    end = min(start + length, len(mm))
+    if end > aligned:
+        mm.madvise(mmap.MADV_WILLNEED, aligned, end - aligned)
+
+
+def iter_frame_infos_mmap(mm: mmap.mmap, offset: int = FILE_HEADER_SIZE) -> Iterator[FrameInfo]:
+    """Iterate FrameInfos of a mapped raw file, by default from after the FileHeader.
+
+    Same results as iter_frame_infos, but headers are unpacked straight
+    from the mapping and payloads are skipped by offset arithmetic, with
+    no read or seek call per frame.
+
+    Frames normally share one payload size, so the run of same-sized
+    frames is unpacked by struct.iter_unpack with a record format whose
+    trailing pad bytes cover the payload. The per-header walk resumes at
+    the first frame of another size and for any truncated tail.
+    """
+    unpack_from = FRAME_HEADER_STRUCT.unpack_from
+    last_header = len(mm) - FRAME_HEADER_SIZE
+    if offset <= last_header:
+        stride_payload = unpack_from(mm, offset)[1]
+        record = struct.Struct(f"{FRAME_HEADER_FORMAT}{stride_payload}x")
+        count = (len(mm) - offset) // record.size
+        with memoryview(mm) as view:
+            for magic, payload_size, frame_index, timestamp_ns in record.iter_unpack(
+                    view[offset:offset + count * record.size]):
+                if payload_size != stride_payload:
+                    break
+                yield FrameInfo(frame_index, timestamp_ns, payload_size, offset, magic)
+                offset += record.size
+    while offset <= last_header:
+        magic, payload_size, frame_index, timestamp_ns = unpack_from(mm, offset)
+        yield FrameInfo(frame_index, timestamp_ns, payload_size, offset, magic)
+        offset += FRAME_HEADER_SIZE + payload_size
+
+
+SCAN_BATCH_FRAMES = 65536  # fixed-stride records unpacked per batch
+
+
+def scan_frame_columns(mm: mmap.mmap, offset: int = FILE_HEADER_SIZE) -> FrameColumns:
+    """Scan a mapped raw file into FrameColumns, by default from after the FileHeader.
+
+    Same frames as iter_frame_infos_mmap, but no per-frame object is
+    kept: the fixed-stride run is unpacked in batches and each batch is
+    split into the column arrays by C-level maps.
+    """
+    cols = FrameColumns(array.array('Q'), array.array('q'), array.array('I'),
+                        array.array('q'), array.array('q'))
+    unpack_from = FRAME_HEADER_STRUCT.unpack_from
+    last_header = len(mm) - FRAME_HEADER_SIZE
+    if offset <= last_header:
+        stride_payload = unpack_from(mm, offset)[1]
+        record = struct.Struct(f"{FRAME_HEADER_FORMAT}{stride_payload}x")
+        count = (len(mm) - offset) // record.size
+        with memoryview(mm) as view:
+            records = record.iter_unpack(view[offset:offset + count * record.size])
+            while True:
+                batch = list(itertools.islice(records, SCAN_BATCH_FRAMES))
+                if not batch:
+                    break
+                run = _first_true(map(stride_payload.__ne__, map(operator.itemgetter(1), batch)))
+                if run >= 0:
+                    del batch[run:]
+                base = len(cols.frame_index)
+                cols.bad_magic.extend(itertools.compress(
+                    range(base, base + len(batch)),
+                    map(FRAM_MAGIC.__ne__, map(operator.itemgetter(0), batch))))
+                cols.payload_size.extend(map(operator.itemgetter(1), batch))
+                cols.frame_index.extend(map(operator.itemgetter(2), batch))
+                cols.timestamp_ns.extend(map(operator.itemgetter(3), batch))
+                cols.file_offset.extend(range(offset, offset + len(batch) * record.size, record.size))
+                offset += len(batch) * record.size
+                if run >= 0:
+                    break
+            del records
+    while offset <= last_header:
+        magic, payload_size, frame_index, timestamp_ns = unpack_from(mm, offset)
+        if magic != FRAM_MAGIC:
+            cols.bad_magic.append(len(cols.frame_index))
+        cols.frame_index.append(frame_index)
+        cols.timestamp_ns.append(timestamp_ns)
+        cols.payload_size.append(payload_size)
+        cols.file_offset.append(offset)
+        offset += FRAME_HEADER_SIZE + payload_size
+    return cols
 
 
 # ---------------------------------------------------------------------------
@@ -177,23 +312,26 @@ def discover_session_files(session_dir: str) -> Dict[str, SessionFiles]:
 
 def read_csv_timestamps(csv_path: str) -> List[Tuple[str, int]]:
     """Read (frame_number, device_timestamp_ns) from CSV."""
-    rows: List[Tuple[str, int]] = []
     with open(csv_path, "r", newline="", encoding="utf-8") as f:
         reader = csv.reader(f)
         header = next(reader, None)
         if header is None:
-            return rows
-        for row in reader:
-            if len(row) < 2:
-                continue
-            rows.append((row[0], int(row[1])))
-    return rows
+            return []
+        return [(row[0], int(row[1])) for row in reader if len(row) >= 2]
 
 
 # ---------------------------------------------------------------------------
 # Subcommand: dump
 # ---------------------------------------------------------------------------
 
+def _first_true(flags: Iterator[bool]) -> int:
+    """Return the position of the first true flag, or -1 if there is none."""
+    try:
+        return operator.indexOf(flags, True)
+    except ValueError:
+        return -1
+
+
 def _format_pixel_format(pf: int) -> str:
     name = PIXEL_FORMAT_NAMES.get(pf, "Unknown")
     return f"{name} ({pf})"
@@ -224,7 +362,8 @@ def cmd_dump(args: argparse.Namespace) -> int:
         print(f"  pixel_format:       {_format_pixel_format(fh.pixel_format)}")
         print()
 
-        frames = list(iter_frame_infos(f))
+        with map_raw_file(f) as mm:
+            frames = list(iter_frame_infos_mmap(mm))
         total = len(frames)
 
         print(f"=== Frames ({total} total) ===")
@@ -274,10 +413,14 @@ def _validate_camera(serial: str, sf: SessionFiles) -> Tuple[int, int]:
         print(f"  [SKIP] No raw files found")
         return passes, fails
 
-    # Collect all frame infos across split files
-    all_frames: List[FrameInfo] = []
+    # Collect per-frame columns across split files in one scan per file
+    frame_indices = array.array('Q')
+    timestamps = array.array('q')
+    payload_sizes = array.array('I')
     file_headers: List[FileHeader] = []
+    header_basenames: List[str] = []  # parallel to file_headers
     file_frame_counts: List[Tuple[str, int]] = []
+    magic_errors: List[str] = []
 
     for raw_path in sf.raw_files:
         basename = os.path.basename(raw_path)
@@ -285,9 +428,17 @@ def _validate_camera(serial: str, sf: SessionFiles) -> Tuple[int, int]:
             with open(raw_path, "rb") as f:
                 fh = read_file_header(f)
                 file_headers.append(fh)
-                file_frames = list(iter_frame_infos(f))
-                file_frame_counts.append((basename, len(file_frames)))
-                all_frames.extend(file_frames)
+                header_basenames.append(basename)
+                with map_raw_file(f) as mm:
+                    cols = scan_frame_columns(mm)
+                file_frame_counts.append((basename, len(cols.frame_index)))
+                frame_indices.extend(cols.frame_index)
+                timestamps.extend(cols.timestamp_ns)
+                payload_sizes.extend(cols.payload_size)
+                magic_errors.extend(
+                    f"frame_index={cols.frame_index[i]} in {basename}"
+                    for i in cols.bad_magic
+                )
         except (ValueError, OSError) as e:
             print(f"  [ERROR] Failed to read {basename}: {e}")
             fails += 1
@@ -295,6 +446,7 @@ def _validate_camera(serial: str, sf: SessionFiles) -> Tuple[int, int]:
 
     if not file_headers:
         return passes, fails
+    frame_count = len(frame_indices)
 
     # Print file summary
     raw_desc = ", ".join(f"{name} ({count} frames)" for name, count in file_frame_counts)
@@ -311,7 +463,7 @@ def _validate_camera(serial: str, sf: SessionFiles) -> Tuple[int, int]:
     if all_magic_ok:
         _pass("V1", "FileHeader magic")
     else:
-        bad = [os.path.basename(sf.raw_files[i]) for i, fh in enumerate(file_headers) if fh.magic != SRAW_MAGIC]
+        bad = [name for name, fh in zip(header_basenames, file_headers) if fh.magic != SRAW_MAGIC]
         _fail("V1", f"FileHeader magic mismatch in: {', '.join(bad)}")
 
     # V2: FileHeader version
@@ -319,33 +471,12 @@ def _validate_camera(serial: str, sf: SessionFiles) -> Tuple[int, int]:
     if all_ver_ok:
         _pass("V2", "FileHeader version")
     else:
-        bad = [os.path.basename(sf.raw_files[i]) for i, fh in enumerate(file_headers) if fh.version != SRAW_VERSION]
+        bad = [name for name, fh in zip(header_basenames, file_headers) if fh.version != SRAW_VERSION]
         _fail("V2", f"FileHeader version mismatch in: {', '.join(bad)}")
 
-    # V3: FrameHeader magic
-    bad_magic_frames = [fi for fi in all_frames if fi.frame_index is not None
-                        and False]  # Need actual magic check — re-read from FrameInfo
-    # Note: iter_frame_infos doesn't store magic. We need to check during iteration.
-    # Re-scan for magic check
-    magic_errors: List[str] = []
-    for raw_path in sf.raw_files:
-        try:
-            with open(raw_path, "rb") as f:
-                f.seek(FILE_HEADER_SIZE)
-                while True:
-                    fh = read_frame_header(f)
-                    if fh is None:
-                        break
-                    if fh.magic != FRAM_MAGIC:
-                        magic_errors.append(
-                            f"frame_index={fh.frame_index} in {os.path.basename(raw_path)}"
-                        )
-                    f.seek(fh.payload_size, os.SEEK_CUR)
-        except OSError:
-            pass
-
+    # V3: FrameHeader magic (collected during the frame scan above)
     if not magic_errors:
-        _pass("V3", f"FrameHeader magic ({len(all_frames)} frames checked)")
+        _pass("V3", f"FrameHeader magic ({frame_count} frames checked)")
     else:
         _fail("V3", f"FrameHeader magic mismatch: {magic_errors[0]}" +
               (f" (+{len(magic_errors)-1} more)" if len(magic_errors) > 1 else ""))
@@ -354,35 +485,29 @@ def _validate_camera(serial: str, sf: SessionFiles) -> Tuple[int, int]:
     ref_header = file_headers[0]
     bpp = PIXEL_FORMAT_BPP.get(ref_header.pixel_format, 1)
     expected_payload = ref_header.width * ref_header.height * bpp
-    bad_payload = [fi for fi in all_frames if fi.payload_size != expected_payload]
-    if not bad_payload:
+    first = _first_true(map(expected_payload.__ne__, payload_sizes))
+    if first < 0:
         _pass("V4", f"payload_size == {expected_payload} ({ref_header.width}*{ref_header.height}*{bpp})")
     else:
-        first = bad_payload[0]
-        _fail("V4", f"payload_size mismatch at frame_index={first.frame_index}: "
-              f"expected {expected_payload}, got {first.payload_size}" +
-              (f" (+{len(bad_payload)-1} more)" if len(bad_payload) > 1 else ""))
+        bad_count = len(payload_sizes) - payload_sizes.count(expected_payload)
+        _fail("V4", f"payload_size mismatch at frame_index={frame_indices[first]}: "
+              f"expected {expected_payload}, got {payload_sizes[first]}" +
+              (f" (+{bad_count-1} more)" if bad_count > 1 else ""))
 
     # V5: frame_index continuity
-    gap_found = False
-    for i, fi in enumerate(all_frames):
-        if fi.frame_index != i:
-            _fail("V5", f"frame_index gap at position {i} (expected {i}, got {fi.frame_index})")
-            gap_found = True
-            break
-    if not gap_found:
-        last_idx = len(all_frames) - 1 if all_frames else -1
+    i = _first_true(map(operator.ne, frame_indices, range(len(frame_indices))))
+    if i >= 0:
+        _fail("V5", f"frame_index gap at position {i} (expected {i}, got {frame_indices[i]})")
+    else:
+        last_idx = frame_count - 1
         _pass("V5", f"frame_index continuous (0..{last_idx})")
 
     # V6: timestamp_ns monotonically increasing
-    ts_error = False
-    for i in range(1, len(all_frames)):
-        if all_frames[i].timestamp_ns <= all_frames[i - 1].timestamp_ns:
-            _fail("V6", f"timestamp_ns not increasing at frame_index={all_frames[i].frame_index}: "
-                  f"{all_frames[i].timestamp_ns} <= {all_frames[i-1].timestamp_ns}")
-            ts_error = True
-            break
-    if not ts_error:
+    i = _first_true(map(operator.le, itertools.islice(timestamps, 1, None), timestamps)) + 1
+    if i > 0:
+        _fail("V6", f"timestamp_ns not increasing at frame_index={frame_indices[i]}: "
+              f"{timestamps[i]} <= {timestamps[i-1]}")
+    else:
         _pass("V6", "timestamp_ns monotonically increasing")
 
     # V7, V8: CSV comparison
@@ -391,29 +516,30 @@ def _validate_camera(serial: str, sf: SessionFiles) -> Tuple[int, int]:
         print(f"  [SKIP] V8: CSV file not found")
     else:
         # V7: row count
-        if len(csv_rows) == len(all_frames):
-            _pass("V7", f"CSV rows ({len(csv_rows)}) == Raw frames ({len(all_frames)})")
+        if len(csv_rows) == frame_count:
+            _pass("V7", f"CSV rows ({len(csv_rows)}) == Raw frames ({frame_count})")
         else:
-            _fail("V7", f"CSV rows ({len(csv_rows)}) != Raw frames ({len(all_frames)})")
+            _fail("V7", f"CSV rows ({len(csv_rows)}) != Raw frames ({frame_count})")
 
         # V8: timestamp match
-        min_len = min(len(csv_rows), len(all_frames))
-        ts_mismatch = None
-        for i in range(min_len):
-            csv_ts = csv_rows[i][1]
-            raw_ts = all_frames[i].timestamp_ns
-            if csv_ts != raw_ts:
-                ts_mismatch = (i, csv_ts, raw_ts)
-                break
-        if ts_mismatch is None:
+        min_len = min(len(csv_rows), frame_count)
+        idx = _first_true(map(operator.ne, map(operator.itemgetter(1), csv_rows), timestamps))
+        if idx < 0:
             _pass("V8", f"CSV timestamps match Raw timestamps ({min_len} checked)")
         else:
-            idx, csv_ts, raw_ts = ts_mismatch
-            _fail("V8", f"timestamp mismatch at frame {idx}: CSV={csv_ts} Raw={raw_ts}")
+            _fail("V8", f"timestamp mismatch at frame {idx}: CSV={csv_rows[idx][1]} Raw={timestamps[idx]}")
 
     return passes, fails
 
 
+def _validate_camera_captured(serial: str, sf: SessionFiles) -> Tuple[int, int, str]:
+    """Run _validate_camera with its report captured. Returns (pass_count, fail_count, report)."""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        passes, fails = _validate_camera(serial, sf)
+    return passes, fails, out.getvalue()
+
+
 def cmd_validate(args: argparse.Namespace) -> int:
     session_dir = args.session_dir
 
@@ -432,12 +558,29 @@ def cmd_validate(args: argparse.Namespace) -> int:
     total_pass = 0
     total_fail = 0
 
-    for serial, sf in session_map.items():
-        print(f"--- cam{serial} ---")
-        p, f_count = _validate_camera(serial, sf)
-        total_pass += p
-        total_fail += f_count
-        print()
+    # Cameras are validated in parallel worker processes; each report is
+    # captured and printed in session order once that camera is done.
+    workers = min(len(session_map), os.cpu_count() or 1)
+    if workers > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (serial, pool.submit(_validate_camera_captured, serial, sf))
+                for serial, sf in session_map.items()
+            ]
+            for serial, future in futures:
+                p, f_count, report = future.result()
+                print(f"--- cam{serial} ---")
+                print(report, end="")
+                total_pass += p
+                total_fail += f_count
+                print()
+    else:
+        for serial, sf in session_map.items():
+            print(f"--- cam{serial} ---")
+            p, f_count = _validate_camera(serial, sf)
+            total_pass += p
+            total_fail += f_count
+            print()
 
     total = total_pass + total_fail
     if total_fail == 0:
@@ -482,12 +625,13 @@ def cmd_sync_check(args: argparse.Namespace) -> int:
 
     # Find common frame numbers
     serials = sorted(camera_data.keys())
-    common_frames = set(camera_data[serials[0]].keys())
-    for serial in serials[1:]:
-        common_frames &= set(camera_data[serial].keys())
+    # set.intersection probes each camera's dict directly, without first
+    # copying its keys into a set.
+    common_frames = set(camera_data[serials[0]]).intersection(
+        *(camera_data[serial] for serial in serials[1:]))
 
     # Sort frame numbers
-    common_frames_sorted = sorted(common_frames, key=lambda x: int(x))
+    common_frames_sorted = sorted(common_frames, key=int)
 
     if not common_frames_sorted:
         print("Error: no common frames across cameras", file=sys.stderr)
@@ -500,23 +644,21 @@ def cmd_sync_check(args: argparse.Namespace) -> int:
     print(f"Threshold: {threshold_ms:.3f} ms")
     print()
 
-    # Calculate per-frame diffs
-    diffs: List[int] = []  # max-min per frame in ns
+    # Calculate per-frame diffs column-wise: one timestamp list per camera,
+    # aligned on common_frames_sorted, reduced across cameras per frame.
+    columns = [list(map(camera_data[serial].__getitem__, common_frames_sorted))
+               for serial in serials]
+    frame_max = list(map(max, *columns))
+    frame_min = list(map(min, *columns))
+    diffs: List[int] = list(map(operator.sub, frame_max, frame_min))  # max-min per frame in ns
     violations: List[Tuple[str, float, str, str]] = []  # (frame_num, diff_ms, max_serial, min_serial)
 
-    for frame_num in common_frames_sorted:
-        timestamps = {serial: camera_data[serial][frame_num] for serial in serials}
-        ts_values = list(timestamps.values())
-        ts_max = max(ts_values)
-        ts_min = min(ts_values)
-        diff = ts_max - ts_min
-        diffs.append(diff)
-
-        if diff > threshold_ns:
-            max_serial = [s for s, t in timestamps.items() if t == ts_max][0]
-            min_serial = [s for s, t in timestamps.items() if t == ts_min][0]
-            diff_ms = diff / 1_000_000.0
-            violations.append((frame_num, diff_ms, max_serial, min_serial))
+    for i in itertools.compress(range(len(diffs)), map(threshold_ns.__lt__, diffs)):
+        ts_values = [column[i] for column in columns]
+        max_serial = serials[ts_values.index(frame_max[i])]
+        min_serial = serials[ts_values.index(frame_min[i])]
+        diff_ms = diffs[i] / 1_000_000.0
+        violations.append((common_frames_sorted[i], diff_ms, max_serial, min_serial))
 
     # Statistics
     mean_ns = sum(diffs) / len(diffs)
@@ -557,17 +699,45 @@ def cmd_sync_check(args: argparse.Namespace) -> int:
 # ---------------------------------------------------------------------------
 
 
-def read_frame_payload(f: BinaryIO, frame_index: int) -> Tuple[FrameHeader, bytes]:
-    """Seek to frame_index (0-based position in file) and return (FrameHeader, payload)."""
-    for i in range(frame_index):
-        fh = read_frame_header(f)
-        if fh is None:
-            raise ValueError(f"Frame {frame_index} out of range (file has {i} frames)")
-        f.seek(fh.payload_size, os.SEEK_CUR)
-    fh = read_frame_header(f)
-    if fh is None:
-        raise ValueError(f"Frame {frame_index} out of range (file has {frame_index} frames)")
-    payload = f.read(fh.payload_size)
+def read_frame_payload(
+    f: BinaryIO,
+    frame_index: int,
+    expected_payload: Optional[int] = None,
+) -> Tuple[FrameHeader, bytes]:
+    """Locate frame_index (0-based position in file) and return (FrameHeader, payload).
+
+    The file is read through a mapping. If every frame is expected to
+    carry expected_payload bytes, the frame's offset is computed
+    directly; the header walk from the first frame is only needed when
+    the header found there does not fit that layout. A fitting header
+    must also continue the first frame's frame_index, so an earlier
+    odd-sized frame cannot make the jump land on a different frame.
+    """
+    with map_raw_file(f) as mm:
+        if expected_payload is not None and frame_index >= 0:
+            offset = FILE_HEADER_SIZE + frame_index * (FRAME_HEADER_SIZE + expected_payload)
+            start = offset + FRAME_HEADER_SIZE
+            if start <= len(mm):
+                first_index = FRAME_HEADER_STRUCT.unpack_from(mm, FILE_HEADER_SIZE)[2]
+                fh = FrameHeader(*FRAME_HEADER_STRUCT.unpack_from(mm, offset))
+                if (fh.magic == FRAM_MAGIC and fh.payload_size == expected_payload
+                        and fh.frame_index == first_index + frame_index
+                        and start + fh.payload_size <= len(mm)):
+                    _prefetch_mapped_range(mm, start, fh.payload_size)
+                    return fh, mm[start:start + fh.payload_size]
+
+        with contextlib.closing(iter_frame_infos_mmap(mm)) as frames:
+            fi = next(itertools.islice(frames, max(frame_index, 0), None), None)
+        if fi is None:
+            with contextlib.closing(iter_frame_infos_mmap(mm)) as frames:
+                count = sum(1 for _ in frames)
+            # A negative index only ever looked at frame 0 and reported itself.
+            raise ValueError(f"Frame {frame_index} out of range "
+                             f"(file has {min(count, frame_index)} frames)")
+        fh = FrameHeader(fi.magic, fi.payload_size, fi.frame_index, fi.timestamp_ns)
+        start = fi.file_offset + FRAME_HEADER_SIZE
+        _prefetch_mapped_range(mm, start, fh.payload_size)
+        payload = mm[start:start + fh.payload_size]
     if len(payload) < fh.payload_size:
         raise ValueError(f"Unexpected EOF reading payload (got {len(payload)}, expected {fh.payload_size})")
     return fh, payload
@@ -602,8 +772,10 @@ def cmd_view(args: argparse.Namespace) -> int:
                   f"Only BayerGR8 (0) is supported.", file=sys.stderr)
             return EXIT_ERROR
 
+        expected_payload = (file_hdr.width * file_hdr.height
+                            * PIXEL_FORMAT_BPP[file_hdr.pixel_format])
         try:
-            frame_hdr, payload = read_frame_payload(f, frame_index)
+            frame_hdr, payload = read_frame_payload(f, frame_index, expected_payload)
         except ValueError as e:
             print(f"Error: {e}", file=sys.stderr)
             return EXIT_ERROR
@@ -612,7 +784,23 @@ def cmd_view(args: argparse.Namespace) -> int:
     bayer = np.frombuffer(payload, dtype=np.uint8).reshape((file_hdr.height, file_hdr.width))
     # GenICam BayerGR8 corresponds to OpenCV's BayerGB pattern
     # (OpenCV names the pattern from the 2nd row/column).
-    bgr = cv2.cvtColor(bayer, cv2.COLOR_BayerGB2BGR)
+    # Demosaic on the GPU when OpenCV has CUDA image processing and a
+    # device; otherwise (or if the GPU call fails) on the CPU.
+    bgr = None
+    try:
+        use_cuda = (hasattr(cv2, "cuda") and hasattr(cv2.cuda, "demosaicing")
+                    and cv2.cuda.getCudaEnabledDeviceCount() > 0)
+    except cv2.error:
+        use_cuda = False
+    if use_cuda:
+        try:
+            gpu_bayer = cv2.cuda_GpuMat()
+            gpu_bayer.upload(bayer)
+            bgr = cv2.cuda.demosaicing(gpu_bayer, cv2.COLOR_BayerGB2BGR).download()
+        except cv2.error:
+            bgr = None
+    if bgr is None:
+        bgr = cv2.cvtColor(bayer, cv2.COLOR_BayerGB2BGR)
 
     # Console output
     basename = os.path.basename(raw_file)
@@ -649,29 +837,43 @@ def cmd_view(args: argparse.Namespace) -> int:
 # Subcommand: encode
 # ---------------------------------------------------------------------------
 
+ENCODE_PREFETCH_FRAMES = 4  # payloads read ahead of the ffmpeg pipe
+
 
-def scan_frame_locations(raw_files: List[str]) -> Tuple[FileHeader, List[FrameLocation]]:
-    """Scan all raw files and collect FrameLocations. Returns (FileHeader, locations)."""
+def scan_frame_locations(
+    raw_files: List[str],
+) -> Tuple[FileHeader, List[FrameLocation], List[Tuple[str, int]]]:
+    """Scan all raw files and collect FrameLocations.
+
+    Returns (FileHeader, locations, file_frame_counts), where
+    file_frame_counts lists (basename, frame count) for each file that
+    holds frames.
+    """
     file_header: Optional[FileHeader] = None
     locations: List[FrameLocation] = []
+    file_frame_counts: List[Tuple[str, int]] = []
 
     for raw_path in raw_files:
+        start = len(locations)
         with open(raw_path, "rb") as f:
             fh = read_file_header(f)
             if file_header is None:
                 file_header = fh
-            for fi in iter_frame_infos(f):
-                locations.append(FrameLocation(
-                    raw_path=raw_path,
-                    file_offset=fi.file_offset,
-                    payload_size=fi.payload_size,
-                    frame_index=fi.frame_index,
-                    timestamp_ns=fi.timestamp_ns,
-                ))
+            with map_raw_file(f) as mm:
+                for fi in iter_frame_infos_mmap(mm):
+                    locations.append(FrameLocation(
+                        raw_path=raw_path,
+                        file_offset=fi.file_offset,
+                        payload_size=fi.payload_size,
+                        frame_index=fi.frame_index,
+                        timestamp_ns=fi.timestamp_ns,
+                    ))
+        if len(locations) > start:
+            file_frame_counts.append((os.path.basename(raw_path), len(locations) - start))
 
     if file_header is None:
         raise ValueError("No raw files to scan")
-    return file_header, locations
+    return file_header, locations, file_frame_counts
 
 
 def build_frame_plan(locations: List[FrameLocation], fps: int) -> List[int]:
@@ -679,9 +881,14 @@ def build_frame_plan(locations: List[FrameLocation], fps: int) -> List[int]:
     if not locations:
         return []
 
-    t_first = locations[0].timestamp_ns
-    t_last = locations[-1].timestamp_ns
+    timestamps = [loc.timestamp_ns for loc in locations]
+    t_first = timestamps[0]
+    t_last = timestamps[-1]
     interval_ns = 1_000_000_000 / fps
+    # With non-decreasing timestamps the floor frame for each target is a
+    # binary search; otherwise keep the forward walk, which stops at the
+    # first later timestamp.
+    sorted_ts = all(map(operator.le, timestamps, itertools.islice(timestamps, 1, None)))
 
     plan: List[int] = []
     raw_idx = 0
@@ -694,9 +901,12 @@ def build_frame_plan(locations: List[FrameLocation], fps: int) -> List[int]:
             break
 
         # Advance raw_idx to the floor frame for t_target
-        while (raw_idx + 1 < len(locations)
-               and locations[raw_idx + 1].timestamp_ns <= t_target):
-            raw_idx += 1
+        if sorted_ts:
+            raw_idx = max(raw_idx, bisect.bisect_right(timestamps, t_target, raw_idx) - 1)
+        else:
+            while (raw_idx + 1 < len(timestamps)
+                   and timestamps[raw_idx + 1] <= t_target):
+                raw_idx += 1
 
         plan.append(raw_idx)
         mp4_frame += 1
@@ -728,46 +938,218 @@ def build_ffmpeg_encode_command(
     ]
 
 
-def encode_frames(
-    plan: List[int],
+def _read_payload_into(fd: int, loc: FrameLocation, buf: bytearray) -> memoryview:
+    """Read one frame payload into buf with preadv (no shared file position)."""
+    payload = memoryview(buf)[:loc.payload_size]
+    offset = loc.file_offset + FRAME_HEADER_SIZE
+    got = 0
+    while got < loc.payload_size:
+        n = os.preadv(fd, [payload[got:]], offset + got)
+        if n == 0:
+            raise IOError(
+                f"Unexpected EOF reading payload at frame_index={loc.frame_index} "
+                f"in {os.path.basename(loc.raw_path)}"
+            )
+        got += n
+    return payload
+
+
+def _prefetch_payloads(
+    runs: List[Tuple[int, int]],
     locations: List[FrameLocation],
-    ffmpeg_stdin: BinaryIO,
+    free: "queue.SimpleQueue[Optional[bytearray]]",
+    out: "queue.SimpleQueue[object]",
+) -> None:
+    """Read the payload of each plan run into out, in order.
+
+    Each payload is read into a buffer taken from free and put on out as
+    (buffer, payload view); a None from free stops the reader. Any
+    exception, not only a read error, is put on out in place of the
+    payload so the consumer re-raises it instead of waiting forever.
+    """
+    fd = -1
+    current_path: Optional[str] = None
+    try:
+        for raw_idx, _repeat in runs:
+            buf = free.get()
+            if buf is None:
+                return
+            loc = locations[raw_idx]
+            if current_path != loc.raw_path:
+                if fd >= 0:
+                    os.close(fd)
+                    fd = -1
+                fd = _open_payload_stream(loc.raw_path)
+                current_path = loc.raw_path
+            if len(buf) < loc.payload_size:
+                buf = bytearray(loc.payload_size)
+            out.put((buf, _read_payload_into(fd, loc, buf)))
+    except BaseException as e:
+        out.put(e)
+    finally:
+        if fd >= 0:
+            os.close(fd)
+
+
+def _open_payload_stream(path: str) -> int:
+    """Open a raw file whose payloads are about to be read front to back.
+
+    Plan indices never decrease, so each file is opened once per encode;
+    the sequential hint widens the kernel's readahead for the stream.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return fd
+
+
+class _SendfileUnsupported(Exception):
+    """sendfile() refused the output before any payload was sent."""
+
+
+# errnos meaning sendfile() cannot target this fd at all (e.g. macOS only
+# supports sockets, older kernels only sockets or regular files)
+_SENDFILE_UNSUPPORTED_ERRNOS = {errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK, errno.EOPNOTSUPP}
+
+
+def _sendfile_payload(out_fd: int, fd: int, loc: FrameLocation) -> None:
+    """Send one frame payload from fd to out_fd in the kernel."""
+    offset = loc.file_offset + FRAME_HEADER_SIZE
+    sent = 0
+    while sent < loc.payload_size:
+        n = os.sendfile(out_fd, fd, offset + sent, loc.payload_size - sent)
+        if n == 0:
+            raise IOError(
+                f"Unexpected EOF reading payload at frame_index={loc.frame_index} "
+                f"in {os.path.basename(loc.raw_path)}"
+            )
+        sent += n
+
+
+def _plan_runs(plan: List[int]) -> List[Tuple[int, int]]:
+    """Run-length encode a frame plan into (raw_idx, repeat count) pairs."""
+    return [(raw_idx, sum(1 for _ in run)) for raw_idx, run in itertools.groupby(plan)]
+
+
+def _sendfile_frames(
+    runs: List[Tuple[int, int]],
+    locations: List[FrameLocation],
+    out_fd: int,
 ) -> int:
-    """Pipe selected payloads to ffmpeg. Returns duplicated frame count."""
-    last_payload: Optional[bytes] = None
-    last_raw_idx = -1
-    current_file: Optional[BinaryIO] = None
+    """Send planned payloads to out_fd with sendfile(). Returns duplicated frame count.
+
+    Raises _SendfileUnsupported if the very first sendfile() is refused,
+    so the caller can fall back to copying.
+    """
+    fd = -1
     current_path: Optional[str] = None
     duplicated = 0
+    first = True
 
     try:
-        for raw_idx in plan:
-            if raw_idx == last_raw_idx and last_payload is not None:
-                ffmpeg_stdin.write(last_payload)
-                duplicated += 1
-                continue
-
+        for raw_idx, repeat in runs:
             loc = locations[raw_idx]
             if current_path != loc.raw_path:
-                if current_file is not None:
-                    current_file.close()
-                current_file = open(loc.raw_path, "rb")
+                if fd >= 0:
+                    os.close(fd)
+                    fd = -1
+                fd = _open_payload_stream(loc.raw_path)
                 current_path = loc.raw_path
 
-            current_file.seek(loc.file_offset + FRAME_HEADER_SIZE)
-            payload = current_file.read(loc.payload_size)
-            if len(payload) < loc.payload_size:
-                raise IOError(
-                    f"Unexpected EOF reading payload at frame_index={loc.frame_index} "
-                    f"in {os.path.basename(loc.raw_path)}"
-                )
+            if first:
+                first = False
+                try:
+                    _sendfile_payload(out_fd, fd, loc)
+                except OSError as e:
+                    if e.errno in _SENDFILE_UNSUPPORTED_ERRNOS:
+                        raise _SendfileUnsupported() from e
+                    raise
+            else:
+                _sendfile_payload(out_fd, fd, loc)
+            for _ in range(repeat - 1):
+                _sendfile_payload(out_fd, fd, loc)
+            duplicated += repeat - 1
+    finally:
+        if fd >= 0:
+            os.close(fd)
+
+    return duplicated
 
-            ffmpeg_stdin.write(payload)
-            last_payload = payload
-            last_raw_idx = raw_idx
+
+def encode_frames(
+    plan: List[int],
+    locations: List[FrameLocation],
+    ffmpeg_stdin: BinaryIO,
+) -> int:
+    """Pipe selected payloads to ffmpeg. Returns duplicated frame count.
+
+    Payloads are passed from the page cache to the pipe with sendfile()
+    where the platform allows it, with no copy through Python; otherwise
+    they are copied by _copy_frames. Both work on runs of equal plan
+    entries, so a duplicated frame is read once and sent repeat times.
+    """
+    runs = _plan_runs(plan)
+    if hasattr(os, "sendfile"):
+        ffmpeg_stdin.flush()
+        try:
+            return _sendfile_frames(runs, locations, ffmpeg_stdin.fileno())
+        except _SendfileUnsupported:
+            pass
+    return _copy_frames(runs, locations, ffmpeg_stdin)
+
+
+def _copy_frames(
+    runs: List[Tuple[int, int]],
+    locations: List[FrameLocation],
+    ffmpeg_stdin: BinaryIO,
+) -> int:
+    """Copy planned payloads to ffmpeg. Returns duplicated frame count.
+
+    Payloads are read by a background thread up to ENCODE_PREFETCH_FRAMES
+    ahead, so disk reads overlap the pipe writes instead of alternating
+    with them. They are read into a pool of ENCODE_PREFETCH_FRAMES
+    buffers allocated at the first payload's size, so no payload-sized
+    object is allocated per frame; a larger payload replaces the buffer
+    it lands in. A buffer goes back to the pool once its whole run
+    (the frame and its duplicates) has been written.
+    """
+    free: "queue.SimpleQueue[Optional[bytearray]]" = queue.SimpleQueue()
+    fetched: "queue.SimpleQueue[object]" = queue.SimpleQueue()
+    first_size = locations[runs[0][0]].payload_size if runs else 0
+    for _ in range(ENCODE_PREFETCH_FRAMES):
+        free.put(bytearray(first_size))
+    reader = threading.Thread(
+        target=_prefetch_payloads,
+        args=(runs, locations, free, fetched),
+        name="raw-prefetch",
+        daemon=True,
+    )
+    reader.start()
+
+    duplicated = 0
+
+    try:
+        for _raw_idx, repeat in runs:
+            item = fetched.get()
+            if isinstance(item, BaseException):
+                raise item
+            buf, payload = item
+
+            for _ in range(repeat):
+                ffmpeg_stdin.write(payload)
+            free.put(buf)
+            duplicated += repeat - 1
     finally:
-        if current_file is not None:
-            current_file.close()
+        # The reader takes a buffer before every read: with the pool emptied,
+        # the sentinel is the next thing it gets, so it stops after at most
+        # the read in progress.
+        while True:
+            try:
+                free.get_nowait()
+            except queue.Empty:
+                break
+        free.put(None)
+        reader.join()
 
     return duplicated
 
@@ -827,7 +1209,7 @@ def cmd_encode(args: argparse.Namespace) -> int:
 
     # Pass 1: Scan headers
     try:
-        file_hdr, locations = scan_frame_locations(sf.raw_files)
+        file_hdr, locations, file_frame_counts = scan_frame_locations(sf.raw_files)
     except (ValueError, OSError) as e:
         print(f"Error: {e}", file=sys.stderr)
         return EXIT_ERROR
@@ -861,19 +1243,6 @@ def cmd_encode(args: argparse.Namespace) -> int:
     note = _classify_frame_plan(raw_effective_fps, fps, duplicated, skipped, len(plan))
 
     # File summary
-    file_frame_counts: List[Tuple[str, int]] = []
-    current_file = None
-    count = 0
-    for loc in locations:
-        if loc.raw_path != current_file:
-            if current_file is not None:
-                file_frame_counts.append((os.path.basename(current_file), count))
-            current_file = loc.raw_path
-            count = 0
-        count += 1
-    if current_file is not None:
-        file_frame_counts.append((os.path.basename(current_file), count))
-
     raw_desc = ", ".join(f"{name} ({c} frames)" for name, c in file_frame_counts)
 
     print(f"=== Encode: {session_dir} cam{serial} ===")